@@ -0,0 +1,201 @@
+"""
+Times each phase of validation separately for synthetic files of various sizes.
+
+    python benchmarks/bench.py run --output results.json
+    python benchmarks/bench.py compare baseline.json results.json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import time
+from contextlib import redirect_stdout
+from io import StringIO
+from tempfile import TemporaryDirectory
+from typing import Any, Callable, Dict, List
+
+from generate import CASES
+
+
+def measure(func: Callable[[], Any], repeat: int, setup: Callable[[], Any] = lambda: None) -> Dict[str, float]:
+    timings = []
+    for _ in range(repeat):
+        setup()
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+
+    return {"min": min(timings), "median": statistics.median(timings)}
+
+
+def reset_memo():
+    from pyproject_validate import requirements
+
+    # Measure the cost of parsing rather than of looking up previous results
+    requirements._memo.clear()
+    requirements._new.clear()
+
+
+def invoke_cli():
+    from pyproject_validate.cli import main
+
+    original_argv = sys.argv
+    sys.argv = ["pyproject-validate", "--no-cache"]
+    try:
+        with redirect_stdout(StringIO()):
+            main()
+    except SystemExit:
+        pass
+    finally:
+        sys.argv = original_argv
+
+
+def benchmark_backends(path: str, repeat: int) -> Dict[str, Dict[str, float]]:
+    from pyproject_validate.handlers import TOML_BACKENDS
+
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+
+    results = {}
+    for name, backend_class in TOML_BACKENDS.items():
+        if not backend_class.available():
+            continue
+
+        backend = backend_class()
+        data = backend.loads(text)
+        results[f"parse:{name}"] = measure(lambda backend=backend: backend.loads(text), repeat)
+        results[f"serialize:{name}"] = measure(lambda backend=backend, data=data: backend.dumps(data), repeat)
+
+    return results
+
+
+def benchmark_case(path: str, repeat: int) -> Dict[str, Dict[str, float]]:
+    from pyproject_validate.handlers import get_handler
+    from pyproject_validate.validators import get_validators
+
+    results = {"load": measure(lambda: get_handler(path).load(), repeat)}
+    results.update(benchmark_backends(path, repeat))
+
+    data = get_handler(path).load()
+    for name, validator in get_validators().items():
+        results[f"validate:{name}"] = measure(
+            lambda validator=validator: validator.validate(data), repeat, setup=reset_memo
+        )
+
+    save_path = os.path.join(os.path.dirname(path), "saved.toml")
+    saving: Dict[str, Any] = {}
+
+    def prepare_save():
+        shutil.copyfile(path, save_path)
+        handler = get_handler(save_path)
+        data = handler.load()
+        # Modify a value like fixes do so that only it is rewritten
+        data["project"]["name"] += "-x"
+        saving.update(handler=handler, data=data)
+
+    results["save"] = measure(lambda: saving["handler"].save(saving["data"]), repeat, setup=prepare_save)
+
+    original_cwd = os.getcwd()
+    os.chdir(os.path.dirname(path))
+    try:
+        results["cli"] = measure(invoke_cli, repeat, setup=reset_memo)
+    finally:
+        os.chdir(original_cwd)
+
+    return results
+
+
+def run(args):
+    import tomli_w
+
+    os.environ["PYPROJECT_VALIDATE_NO_DAEMON"] = "1"
+
+    results: Dict[str, Any] = {}
+    sizes: Dict[str, int] = {}
+    with TemporaryDirectory() as d:
+        for case in args.cases or list(CASES):
+            directory = os.path.join(d, case)
+            os.mkdir(directory)
+            path = os.path.join(directory, "pyproject.toml")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(tomli_w.dumps(CASES[case]()))
+
+            results[case] = benchmark_case(path, args.repeat)
+            sizes[case] = os.path.getsize(path)
+
+    report = {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "results": results,
+        "sizes": sizes,
+    }
+    for case, phases in results.items():
+        for phase, timing in phases.items():
+            line = f"{case:<10} {phase:<24} {timing['median'] * 1000:>12.3f} ms"
+            # Throughput of the TOML backends is comparable across cases
+            if phase.startswith(("parse:", "serialize:")):
+                line += f" {sizes[case] / timing['median'] / 1_000_000:>10.2f} MB/s"
+
+            print(line)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+def compare(args):
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)["results"]
+    with open(args.current, encoding="utf-8") as f:
+        current = json.load(f)["results"]
+
+    regressions: List[str] = []
+    for case, phases in current.items():
+        for phase, timing in phases.items():
+            previous = baseline.get(case, {}).get(phase)
+            if previous is None:
+                continue
+
+            ratio = timing["median"] / previous["median"]
+            flag = ""
+            if ratio > 1 + args.threshold:
+                flag = "  REGRESSION"
+                regressions.append(f"{case} {phase}")
+
+            print(f"{case:<10} {phase:<24} {ratio:>8.2f}x{flag}")
+
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) above {args.threshold:.0%}")
+        sys.exit(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="bench")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="run the benchmarks")
+    run_parser.add_argument("cases", nargs="*", choices=[[], *CASES], help="cases to run, defaults to all")
+    run_parser.add_argument("--repeat", type=int, default=5, help="number of timings per phase")
+    run_parser.add_argument("--output", help="path to write the results as JSON")
+    run_parser.set_defaults(func=run)
+
+    compare_parser = subparsers.add_parser("compare", help="flag regressions against a baseline")
+    compare_parser.add_argument("baseline", help="results JSON to compare against")
+    compare_parser.add_argument("current", help="results JSON to check")
+    compare_parser.add_argument(
+        "--threshold", type=float, default=0.1, help="relative slowdown of the median considered a regression"
+    )
+    compare_parser.set_defaults(func=compare)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
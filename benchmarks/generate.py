@@ -0,0 +1,77 @@
+"""
+Deterministic generators of synthetic `pyproject.toml` files of various sizes.
+"""
+from __future__ import annotations
+
+import random
+from typing import Any, Dict, List
+
+MARKERS = [
+    'python_version < "3.8"',
+    "sys_platform == 'win32'",
+    'platform_machine != "arm64"',
+    'implementation_name == "cpython" and python_version >= "3.7"',
+]
+SPECIFIERS = ["", ">=1.0", "~=2.3", ">=1.2RC5,<2", "==0.9.*", "!=1.4.1"]
+EXTRAS = ["", "[tls]", "[Socks,TLS]"]
+
+
+def _dependency(rng: random.Random, i: int) -> str:
+    # Mix of already-normalized and unnormalized forms so both paths are exercised
+    name = rng.choice([f"package-{i}", f"Package_{i}", f"pkg.{i}"])
+    dependency = f"{name}{rng.choice(EXTRAS)}{rng.choice(SPECIFIERS)}"
+    if rng.random() < 0.2:
+        dependency += f"; {rng.choice(MARKERS)}"
+
+    return dependency
+
+
+def _dependencies(rng: random.Random, count: int, offset: int = 0) -> List[str]:
+    return [_dependency(rng, offset + i) for i in range(count)]
+
+
+def generate(
+    dependencies: int = 0, optional_groups: int = 0, group_size: int = 10, tool_entries: int = 50, seed: int = 0
+) -> Dict[str, Any]:
+    rng = random.Random(seed)
+    data: Dict[str, Any] = {
+        "build-system": {"requires": ["hatchling"], "build-backend": "hatchling.build"},
+        "project": {"name": "foo", "version": "0.0.1"},
+    }
+    if not (dependencies or optional_groups):
+        return data
+
+    project = data["project"]
+    project.update(
+        {
+            "description": "A synthetic project",
+            "readme": "README.md",
+            "license": "MIT",
+            "authors": [{"name": "U.N. Owen", "email": "void@some.where"}],
+            "classifiers": [
+                "Development Status :: 4 - Beta",
+                "Programming Language :: Python",
+                "Programming Language :: Python :: Implementation :: CPython",
+            ],
+            "dependencies": _dependencies(rng, dependencies),
+            "urls": {"Source": "https://example.com/foo"},
+            "scripts": {"foo": "foo.cli:main"},
+        }
+    )
+    if optional_groups:
+        project["optional-dependencies"] = {
+            f"group{i}": _dependencies(rng, group_size, offset=dependencies + i * group_size)
+            for i in range(optional_groups)
+        }
+
+    data["tool"] = {"foo": {"settings": {f"key{i}": i for i in range(tool_entries)}}}
+    return data
+
+
+CASES = {
+    "small": lambda: generate(),
+    "typical": lambda: generate(dependencies=20, optional_groups=3, group_size=5),
+    "huge": lambda: generate(dependencies=5000, optional_groups=200, group_size=10),
+    # Generated tool configuration of a few megabytes, which is memory-mapped
+    "tool": lambda: generate(dependencies=20, optional_groups=3, group_size=5, tool_entries=100_000),
+}
@@ -0,0 +1,25 @@
+from typing import Any
+
+# Public names mapped to the modules that define them
+_EXPORTS = {
+    "AsyncValidator": "aio",
+    "Result": "api",
+    "ValidatorResult": "api",
+    "fix_text": "api",
+    "validate_data": "api",
+    "validate_path": "api",
+    "validate_text": "api",
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name: str) -> Any:
+    # The API is imported on first use so that the CLI starts quickly
+    module_name = _EXPORTS.get(name)
+    if module_name is not None:
+        from importlib import import_module
+
+        return getattr(import_module(f".{module_name}", __name__), name)
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
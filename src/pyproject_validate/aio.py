@@ -0,0 +1,91 @@
+"""
+Counterparts of the validation API for use within an event loop.
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+from concurrent.futures import Executor
+from typing import Any, Callable, Dict, Optional, Sequence
+
+from . import api
+from .api import Result
+
+
+class AsyncValidator:
+    """
+    Runs validation in an `executor` so that neither file I/O nor validation blocks the event
+    loop, using a pool of `max_concurrency` threads if not set. At most `max_concurrency`
+    validations occupy the executor at once and the rest wait their turn without occupying it.
+
+    A process pool may be used to validate in parallel since every argument and result may be
+    pickled. Cancelling a validation that has not yet started prevents it from running, while
+    one that has started keeps its slot until it finishes in the background. Writes of fixes
+    are atomic so files are never left partially written.
+    """
+
+    def __init__(self, executor: Optional[Executor] = None, max_concurrency: Optional[int] = None):
+        if max_concurrency is not None and max_concurrency < 1:
+            raise ValueError("max_concurrency must be a positive integer")
+
+        self.executor = executor
+        self.max_concurrency = max_concurrency or min(32, (os.cpu_count() or 1) + 4)
+        self._owns_executor = executor is None
+        # Created on first use as semaphores were bound to the current event loop before Python 3.10
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    async def __aenter__(self) -> AsyncValidator:
+        return self
+
+    async def __aexit__(self, *exc_info: Any):
+        self.close()
+
+    def close(self):
+        """
+        Shuts down the executor if it was created by this instance.
+        """
+        if self._owns_executor and self.executor is not None:
+            self.executor.shutdown(wait=False)
+            self.executor = None
+
+    async def _run(self, func: Callable[..., Result], *args: Any) -> Result:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        if self.executor is None:
+            from concurrent.futures import ThreadPoolExecutor
+
+            self.executor = ThreadPoolExecutor(self.max_concurrency, thread_name_prefix="pyproject-validate")
+
+        semaphore = self._semaphore
+        await semaphore.acquire()
+        try:
+            future = self.executor.submit(func, *args)
+        except BaseException:
+            semaphore.release()
+            raise
+
+        # Release once the work itself is done rather than when the caller stops waiting for it
+        loop = asyncio.get_running_loop()
+
+        def release(_: Any):
+            try:
+                loop.call_soon_threadsafe(semaphore.release)
+            except RuntimeError:  # no cov
+                # The event loop was closed
+                pass
+
+        future.add_done_callback(release)
+        return await asyncio.wrap_future(future)
+
+    async def validate_data(self, data: Dict[str, Any], validators: Optional[Sequence[str]] = None) -> Result:
+        return await self._run(api.validate_data, data, validators)
+
+    async def validate_text(self, text: str, validators: Optional[Sequence[str]] = None) -> Result:
+        return await self._run(api.validate_text, text, validators)
+
+    async def fix_text(self, text: str, validators: Optional[Sequence[str]] = None) -> Result:
+        return await self._run(api.fix_text, text, validators)
+
+    async def validate_path(self, path: str, fix: bool = False, validators: Optional[Sequence[str]] = None) -> Result:
+        return await self._run(api.validate_path, path, fix, validators)
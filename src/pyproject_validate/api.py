@@ -0,0 +1,150 @@
+"""
+Validation for use within other programs, which neither prints nor exits.
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional, Sequence
+
+from . import requirements
+from .diagnostics import Diagnostic, SourceMap
+from .engine import Outcome, ValidatorReport, apply_validators, resolve_path, validate_file
+from .handlers import get_handler
+from .validators import get_validators, schedule
+
+
+class ValidatorResult:
+    """
+    The diagnostics of a single validator, whose source positions are available if the result
+    came from text or a file.
+    """
+
+    __slots__ = ("name", "errors", "warnings", "fixable")
+
+    def __init__(self, name: str, errors: List[Diagnostic], warnings: List[Diagnostic], fixable: bool):
+        self.name = name
+        self.errors = errors
+        self.warnings = warnings
+        self.fixable = fixable
+
+    def __repr__(self) -> str:
+        return (
+            f"{type(self).__name__}(name={self.name!r}, errors={self.errors!r}, warnings={self.warnings!r}, "
+            f"fixable={self.fixable!r})"
+        )
+
+
+class Result:
+    """
+    The outcome of validating a single document. If the document could not be read or
+    deserialized then `error` is set and there are no validator results. If fixes were applied
+    then `fixed` is set and the validator results describe the original document.
+    """
+
+    __slots__ = ("validators", "error", "text", "fixed")
+
+    def __init__(
+        self,
+        validators: Optional[Dict[str, ValidatorResult]] = None,
+        error: Optional[str] = None,
+        text: Optional[str] = None,
+        fixed: bool = False,
+    ):
+        self.validators = validators if validators is not None else {}
+        self.error = error
+        # The fixed document, for `fix_text`
+        self.text = text
+        self.fixed = fixed
+
+    @property
+    def valid(self) -> bool:
+        if self.error is not None:
+            return False
+
+        return self.fixed or not any(result.errors for result in self.validators.values())
+
+    @property
+    def errors(self) -> List[str]:
+        if self.error is not None:
+            return [self.error]
+
+        return [error.message for result in self.validators.values() for error in result.errors]
+
+    @property
+    def warnings(self) -> List[str]:
+        return [warning.message for result in self.validators.values() for warning in result.warnings]
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(valid={self.valid!r}, errors={self.errors!r}, fixed={self.fixed!r})"
+
+
+def _check(data: Dict[str, Any], validators: Optional[Sequence[str]], fix: bool) -> Outcome:
+    outcome = apply_validators(data, get_validators(schedule(validators)), fix)
+
+    # Nothing persists the normalizations so do not accumulate them
+    requirements.drain()
+    return outcome
+
+
+def _results(reports: List[ValidatorReport], source: Optional[SourceMap] = None) -> Dict[str, ValidatorResult]:
+    if source is not None:
+        for report in reports:
+            report.attach(source)
+
+    return {
+        report.name: ValidatorResult(report.name, report.errors, report.warnings, report.fixable) for report in reports
+    }
+
+
+def validate_data(data: Dict[str, Any], validators: Optional[Sequence[str]] = None) -> Result:
+    """
+    Validates deserialized pyproject.toml `data` without modifying it. The names of the only
+    `validators` to run may be given, unknown names raise a `ValueError`.
+    """
+    return Result(_results(_check(data, validators, fix=False).reports))
+
+
+def validate_text(text: str, validators: Optional[Sequence[str]] = None) -> Result:
+    """
+    Validates the text of a pyproject.toml file.
+    """
+    try:
+        data = get_handler(content=text.encode("utf-8")).load()
+    except Exception as e:
+        return Result(error=str(e))
+
+    return Result(_results(_check(data, validators, fix=False).reports, SourceMap(text)))
+
+
+def fix_text(text: str, validators: Optional[Sequence[str]] = None) -> Result:
+    """
+    Validates the text of a pyproject.toml file, setting the `text` of the result to the fixed
+    document. Fixes are only applied if every error may be fixed, otherwise the `text` is
+    unchanged. Comments and formatting are preserved as much as possible.
+    """
+    handler = get_handler(content=text.encode("utf-8"))
+    try:
+        data = handler.load()
+    except Exception as e:
+        return Result(error=str(e), text=text)
+
+    outcome = _check(data, validators, fix=True)
+    if outcome.need_fixing and not outcome.unfixable_errors:
+        return Result(_results(outcome.reports, SourceMap(text)), text=handler.dumps(data), fixed=True)
+
+    return Result(_results(outcome.reports, SourceMap(text)), text=text)
+
+
+def validate_path(path: str, fix: bool = False, validators: Optional[Sequence[str]] = None) -> Result:
+    """
+    Validates a pyproject.toml file or a directory containing one, writing any fixes back to
+    the file if `fix` is set.
+    """
+    if validators is not None:
+        validators = schedule(validators)
+
+    result = validate_file(resolve_path(path), fix, validators=validators, locate=True)
+    if result.error is not None:
+        return Result(error=result.error)
+
+    fixed = fix and not result.code and any(report.errors for report in result.reports)
+    return Result(_results(result.reports), fixed=fixed)
@@ -0,0 +1,300 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import sys
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Tuple, Union
+
+if TYPE_CHECKING:
+    from mmap import mmap
+
+DEFAULT_MAX_SIZE = 32 * 1024 * 1024
+DEFAULT_DOCUMENT_MAX_SIZE = 64 * 1024 * 1024
+# Incremented whenever the layout of stored results changes
+FORMAT = 2
+# Libraries that determine the messages and normalizations of validators
+VALIDATOR_LIBRARIES = ("packaging", "pydantic")
+
+_library_identity: Optional[str] = None
+
+
+def get_cache_dir() -> str:
+    path = os.environ.get("PYPROJECT_VALIDATE_CACHE_DIR")
+    if path:
+        return path
+
+    if sys.platform == "win32":  # no cov
+        root = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+    else:
+        root = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+
+    return os.path.join(root, "pyproject-validate")
+
+
+def get_library_identity() -> str:
+    """
+    Identifies the installed versions of `VALIDATOR_LIBRARIES` by the location, size and
+    modification time of their modules, which change whenever they are upgraded. Importing them,
+    or `importlib.metadata`, to read their versions would cost more than replaying results.
+    """
+    global _library_identity
+
+    if _library_identity is None:
+        from importlib.util import find_spec
+
+        parts = []
+        for name in VALIDATOR_LIBRARIES:
+            spec = find_spec(name)
+            origin = spec.origin if spec is not None else None
+            if origin is None:
+                parts.append("")
+                continue
+
+            try:
+                st = os.stat(origin)
+            except OSError:  # no cov
+                parts.append(origin)
+            else:
+                parts.append(f"{origin}:{st.st_size}:{st.st_mtime_ns}")
+
+        _library_identity = "\0".join(parts)
+
+    return _library_identity
+
+
+def get_max_size() -> int:
+    return int(os.environ.get("PYPROJECT_VALIDATE_CACHE_MAX_SIZE", DEFAULT_MAX_SIZE))
+
+
+def get_document_max_size() -> int:
+    return int(os.environ.get("PYPROJECT_VALIDATE_DOCUMENT_CACHE_MAX_SIZE", DEFAULT_DOCUMENT_MAX_SIZE))
+
+
+def _entries(directory: str, extension: str) -> List[os.DirEntry]:
+    try:
+        return [entry for entry in os.scandir(directory) if entry.name.endswith(extension)]
+    except OSError:
+        return []
+
+
+def _prune(entries: List[os.DirEntry], max_size: int):
+    """
+    Removes the least recently used `entries` once their total size exceeds `max_size` bytes.
+    """
+    files = []
+    total_size = 0
+    for entry in entries:
+        try:
+            stat = entry.stat()
+        except OSError:  # no cov
+            continue
+
+        files.append((stat.st_mtime_ns, stat.st_size, entry.path))
+        total_size += stat.st_size
+
+    if total_size <= max_size:
+        return
+
+    # Leave some headroom so that every subsequent run does not immediately evict again
+    target_size = max_size * 0.8
+    files.sort()
+    for _, size, path in files:
+        try:
+            os.remove(path)
+        except OSError:  # no cov
+            continue
+
+        total_size -= size
+        if total_size <= target_size:
+            break
+
+
+class ResultCache:
+    """
+    Stores the errors and warnings of every validator keyed on the exact bytes of a file so that
+    unchanged files need not be parsed or validated again. Entries are evicted in least recently
+    used order once the total size exceeds `max_size` bytes.
+    """
+
+    def __init__(self, directory: Optional[str] = None, max_size: Optional[int] = None):
+        self.directory = directory or get_cache_dir()
+        self.max_size = get_max_size() if max_size is None else max_size
+
+    @property
+    def results_dir(self) -> str:
+        return os.path.join(self.directory, "results")
+
+    @property
+    def requirements_path(self) -> str:
+        return os.path.join(self.directory, "requirements.json")
+
+    @property
+    def discovery_path(self) -> str:
+        return os.path.join(self.directory, "discovery.json")
+
+    def key(self, content: Union[bytes, mmap], validators: Iterable[str]) -> str:
+        from ._version import version
+
+        # Memory-mapped files are hashed without being copied
+        hasher = hashlib.sha256(content)
+        hasher.update(f"\0{FORMAT}\0{version}\0{get_library_identity()}\0{','.join(validators)}".encode("utf-8"))
+        return hasher.hexdigest()
+
+    def get(self, key: str) -> Optional[List[Any]]:
+        path = os.path.join(self.results_dir, f"{key}.json")
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                results = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        # Mark the entry as recently used
+        try:
+            os.utime(path)
+        except OSError:  # no cov
+            pass
+
+        return results
+
+    def set(self, key: str, results: List[Any]):
+        results_dir = self.results_dir
+        path = os.path.join(results_dir, f"{key}.json")
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(results_dir, exist_ok=True)
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(results, f, separators=(",", ":"))
+
+            # Concurrent runs may race to store the same entry, but the contents will be identical
+            os.replace(temp_path, path)
+        except OSError:  # no cov
+            pass
+
+    def _entries(self) -> List[os.DirEntry]:
+        return _entries(self.results_dir, ".json")
+
+    def prune(self):
+        _prune(self._entries(), self.max_size)
+
+    def stats(self) -> Dict[str, Any]:
+        entries = 0
+        total_size = 0
+        for entry in self._entries():
+            try:
+                total_size += entry.stat().st_size
+            except OSError:  # no cov
+                continue
+
+            entries += 1
+
+        return {"location": self.directory, "entries": entries, "size": total_size, "max_size": self.max_size}
+
+    def clear(self):
+        """
+        Removes everything stored by this tool, leaving any other files in the directory, since
+        it may be shared with other tools.
+        """
+        shutil.rmtree(self.results_dir, ignore_errors=True)
+        shutil.rmtree(DocumentCache(self.directory).documents_dir, ignore_errors=True)
+        for path in (self.requirements_path, self.discovery_path):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+        try:
+            os.rmdir(self.directory)
+        except OSError:
+            # Not empty or does not exist
+            pass
+
+
+class DocumentCache:
+    """
+    Stores deserialized documents in `marshal` format keyed on the path and the identity of the
+    file according to `os.stat`, so that a hit costs a single `stat` call and unmarshalling
+    rather than reading and parsing. Documents containing values that cannot be marshalled, such
+    as dates, are not stored. Entries are evicted in least recently used order once the total
+    size exceeds `max_size` bytes.
+    """
+
+    # Files modified this recently may be modified again without changing their identity, if the
+    # resolution of timestamps is coarse, so they are not stored
+    RACY_INTERVAL_NS = 2_000_000_000
+
+    def __init__(self, directory: Optional[str] = None, max_size: Optional[int] = None):
+        self.directory = directory or get_cache_dir()
+        self.max_size = get_document_max_size() if max_size is None else max_size
+
+    @property
+    def documents_dir(self) -> str:
+        return os.path.join(self.directory, "documents")
+
+    @staticmethod
+    def identity(stat: os.stat_result) -> Tuple[int, int, int, int]:
+        return stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+    def key(self, path: str, stat: os.stat_result) -> str:
+        import marshal
+
+        # The format of marshalled data may change between Python versions
+        identity = ":".join(map(str, self.identity(stat)))
+        hasher = hashlib.sha256(os.path.abspath(path).encode("utf-8", "surrogateescape"))
+        hasher.update(f"\0{identity}\0{marshal.version}\0{sys.version_info[0]}.{sys.version_info[1]}".encode("utf-8"))
+        return hasher.hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        import marshal
+
+        path = os.path.join(self.documents_dir, f"{key}.marshal")
+        try:
+            with open(path, "rb") as f:
+                data = marshal.loads(f.read())
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+
+        if not isinstance(data, dict):  # no cov
+            return None
+
+        # Mark the entry as recently used
+        try:
+            os.utime(path)
+        except OSError:  # no cov
+            pass
+
+        return data
+
+    def set(self, key: str, data: Dict[str, Any], stat: os.stat_result) -> bool:
+        """
+        Stores the `data` deserialized from the file with the given `stat` result, returning
+        whether it was stored.
+        """
+        import marshal
+        import time
+
+        if time.time_ns() - stat.st_mtime_ns < self.RACY_INTERVAL_NS:
+            return False
+
+        try:
+            content = marshal.dumps(data)
+        except ValueError:
+            return False
+
+        documents_dir = self.documents_dir
+        path = os.path.join(documents_dir, f"{key}.marshal")
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(documents_dir, exist_ok=True)
+            with open(temp_path, "wb") as f:
+                f.write(content)
+
+            os.replace(temp_path, path)
+        except OSError:  # no cov
+            return False
+
+        return True
+
+    def prune(self):
+        _prune(_entries(self.documents_dir, ".marshal"), self.max_size)
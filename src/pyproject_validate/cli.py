@@ -1,53 +1,395 @@
 import argparse
+import os
 import sys
 
-from ._version import version
-from .handlers import get_handler
-from .validators import get_validators
+
+def cache_command(argv):
+    from .cache import ResultCache
+
+    parser = argparse.ArgumentParser(prog="pyproject-validate cache", allow_abbrev=False)
+    parser.add_argument("action", choices=["stats", "clear"], help="show cache usage or remove all entries")
+    args = parser.parse_args(argv)
+
+    cache = ResultCache()
+    if args.action == "clear":
+        cache.clear()
+    else:
+        stats = cache.stats()
+        print(f"Location: {stats['location']}")
+        print(f"Entries: {stats['entries']}")
+        print(f"Size: {stats['size']} / {stats['max_size']} bytes")
+
+    sys.exit(0)
+
+
+def daemon_command(argv):
+    from .daemon import get_socket_path, is_running, is_supported, serve, stop
+
+    parser = argparse.ArgumentParser(prog="pyproject-validate daemon", allow_abbrev=False)
+    parser.add_argument(
+        "action",
+        nargs="?",
+        default="start",
+        choices=["start", "stop", "status"],
+        help="run the daemon in the foreground (default), stop a running daemon, or check if one is running",
+    )
+    args = parser.parse_args(argv)
+
+    if not is_supported():
+        print("the daemon is only supported on platforms with Unix sockets")
+        sys.exit(1)
+
+    path = get_socket_path()
+    if args.action == "start":
+        try:
+            serve(path)
+        except OSError as e:
+            print(e)
+            sys.exit(1)
+        except KeyboardInterrupt:
+            pass
+    elif args.action == "stop":
+        if not stop(path):
+            print(f"no daemon is listening on {path}")
+            sys.exit(1)
+    elif is_running(path):
+        print(f"running on {path}")
+    else:
+        print(f"not running on {path}")
+        sys.exit(1)
+
+    sys.exit(0)
+
+
+def validate_paths(paths, args, cache, validators, jobs=None, timings=False, timer=None, multiple=None):
+    """
+    Validates and reports on the `paths`, which may be an iterator, returning the exit code and
+    the paths of the files that were found if watching.
+    """
+    from .engine import run
+    from .reporters import get_reporter
+
+    if multiple is None:
+        multiple = len(paths) > 1
+
+    reporter = get_reporter(args.format, fix=args.fix, multiple=multiple)
+
+    documents = None
+    if args.document_cache:
+        from .cache import DocumentCache
+
+        documents = DocumentCache()
+
+    exit_code = 0
+    stored = False
+    new_requirements = {}
+    validated_paths = []
+    for result in run(
+        paths,
+        fix=args.fix,
+        jobs=jobs,
+        cache=cache,
+        timings=timings,
+        validators=validators,
+        locate=reporter.locate,
+        documents=documents,
+        toml_backend=args.toml_backend,
+    ):
+        reporter.report(result)
+        exit_code = max(exit_code, result.code)
+        stored = stored or result.stored
+        # Collecting every path would defeat streaming from `--files-from`
+        if args.watch and result.path is not None:
+            validated_paths.append(result.path)
+        if result.requirements:
+            new_requirements.update(result.requirements)
+        if result.spans:
+            timer.spans.extend(result.spans)
+
+    if stored:
+        cache.prune()
+
+    if documents is not None:
+        documents.prune()
+
+    if new_requirements:
+        from .requirements import persist
+
+        persist(cache.requirements_path, new_requirements)
+
+    reporter.finish(exit_code)
+    return exit_code, validated_paths
+
+
+def watch(paths, args, cache, validators):
+    from .watch import get_watcher, wait_for_changes
+
+    watcher = get_watcher(paths)
+    print(f"watching {len(paths)} file(s) for changes, press Ctrl+C to stop", file=sys.stderr)
+    try:
+        while True:
+            changed = wait_for_changes(watcher)
+
+            # Everything stays imported and memoized in this process so only parsing is repeated
+            exit_code, _ = validate_paths(changed, args, cache, validators, jobs=1, multiple=len(paths) > 1)
+            sys.stdout.flush()
+            status = "errors found" if exit_code else "no errors"
+            print(f"validated {len(changed)} changed file(s): {status}", file=sys.stderr)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+
+    sys.exit(0)
+
+
+def reads_stdin(argv):
+    for i, arg in enumerate(argv):
+        if arg == "--files-from=-" or arg == "--files-from" and argv[i + 1 : i + 2] == ["-"]:
+            return True
+
+    return False
+
+
+def stream_paths(paths, stream, config=None):
+    """
+    Yields the `paths`, then those listed in the binary `stream` which is read lazily, and then
+    the `config` file if given. Directories are resolved to the `pyproject.toml` files they contain.
+    """
+    from .discovery import read_paths
+    from .engine import resolve_path
+
+    try:
+        for path in paths:
+            yield resolve_path(path)
+
+        for path in read_paths(stream):
+            yield resolve_path(path)
+    finally:
+        if stream is not sys.stdin.buffer:
+            stream.close()
+
+    if config:
+        yield config
 
 
 def main():
-    parser = argparse.ArgumentParser(prog="pyproject-validate", allow_abbrev=False)
+    argv = sys.argv[1:]
+    if argv[:1] == ["cache"]:
+        cache_command(argv[1:])
+    elif argv[:1] == ["daemon"]:
+        daemon_command(argv[1:])
+
+    from .daemon import forward
+
+    # Watching is long-lived and keeps everything warm in-process anyway, and the daemon cannot
+    # read the standard input of this process
+    response = forward(argv) if "--watch" not in argv and not reads_stdin(argv) else None
+    if response is not None:
+        code, stdout, stderr = response
+        sys.stdout.write(stdout)
+        sys.stderr.write(stderr)
+        sys.exit(code)
+
+    parser = argparse.ArgumentParser(
+        prog="pyproject-validate",
+        allow_abbrev=False,
+        epilog=(
+            "run `pyproject-validate cache {stats,clear}` to manage the cache and "
+            "`pyproject-validate daemon {start,stop,status}` to manage the daemon"
+        ),
+    )
+    parser.add_argument(
+        "paths", nargs="*", help="files or directories to validate, defaults to the nearest `pyproject.toml` file"
+    )
+    parser.add_argument(
+        "--recursive",
+        "-r",
+        action="store_true",
+        help="find every `pyproject.toml` file below the directories, defaults to the current directory",
+    )
+    parser.add_argument(
+        "--changed-since",
+        metavar="REF",
+        help="only validate `pyproject.toml` files that differ from a Git revision, limited to any given paths",
+    )
+    parser.add_argument(
+        "--staged",
+        action="store_true",
+        help="only validate `pyproject.toml` files with staged changes, compared to `HEAD` by default",
+    )
+    parser.add_argument(
+        "--files-from",
+        metavar="FILE",
+        help="also validate the paths listed in a file, or stdin if `-`, delimited by NUL characters or newlines",
+    )
     parser.add_argument("--fix", action="store_true", help="whether to apply fixes for any encountered errors")
+    parser.add_argument("--select", metavar="NAMES", help="comma-separated names of the only validators to run")
+    parser.add_argument("--ignore", metavar="NAMES", help="comma-separated names of validators to skip")
     parser.add_argument("--config", help="explicit path to the project config file")
+    parser.add_argument(
+        "--jobs", "-j", type=int, help="number of processes used to validate multiple files, defaults to the CPU count"
+    )
+    parser.add_argument(
+        "--format",
+        choices=["text", "ndjson"],
+        default="text",
+        help="output format, `ndjson` writes a JSON object per diagnostic followed by a summary",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="after validating, revalidate files whenever they change until interrupted",
+    )
+    parser.add_argument(
+        "--toml-backend",
+        choices=["tomllib", "tomli"],
+        help="library used to parse files, defaults to `tomli` if installed and otherwise `tomllib` on Python 3.11+",
+    )
+    parser.add_argument("--no-cache", action="store_true", help="do not read or write cached validation results")
+    parser.add_argument(
+        "--document-cache",
+        action="store_true",
+        help="cache parsed files keyed on their path, size, modification time and inode for repeated runs",
+    )
+    parser.add_argument("--timings", action="store_true", help="print the time spent in each phase to stderr")
+    parser.add_argument(
+        "--trace-file", help="write the timing of each phase to a file in the Chrome trace event format"
+    )
     if sys.version_info[:2] >= (3, 8):
-        parser.add_argument("--version", action="version", version=f"%(prog)s {version}")
-    args = parser.parse_args()
+        parser.add_argument("--version", action="store_true", help="show program's version number and exit")
+    args = parser.parse_args(argv)
 
-    handler = get_handler(args.config)
-    try:
-        data = handler.load()
-    except Exception as e:
-        print(e)
-        sys.exit(1)
+    # Everything beyond argument parsing is imported on demand to minimize startup time
+    if getattr(args, "version", False):
+        from ._version import version
+
+        print(f"{parser.prog} {version}")
+        sys.exit(0)
+
+    if args.jobs is not None and args.jobs < 1:
+        parser.error("argument --jobs/-j: must be a positive integer")
+
+    validators = None
+    if args.select is not None or args.ignore is not None:
+        from .validators import schedule
+
+        try:
+            validators = schedule(
+                args.select.split(",") if args.select is not None else None,
+                args.ignore.split(",") if args.ignore is not None else None,
+            )
+        except ValueError as e:
+            parser.error(str(e))
+
+    if args.toml_backend is not None:
+        from .handlers import get_toml_backend
+
+        try:
+            get_toml_backend(args.toml_backend)
+        except ValueError as e:
+            parser.error(str(e))
+
+    changed_only = args.changed_since is not None or args.staged
+    if changed_only and args.recursive:
+        parser.error("argument --recursive/-r: not allowed with argument --changed-since or --staged")
+    elif args.files_from is not None and (changed_only or args.recursive):
+        parser.error("argument --files-from: not allowed with argument --recursive/-r, --changed-since or --staged")
+
+    from .engine import resolve_path
+
+    cache = None
+    if not args.no_cache:
+        from .cache import ResultCache
 
-    errors_occurred = False
-    unfixable_errors = False
-    need_fixing = False
-    for name, validator in get_validators().items():
-        errors = []
-        warnings = []
-        validator.validate(data, errors, warnings)
-
-        if (errors or warnings) and not args.fix or not validator.fixable:
-            print(f"<<< {name} >>>")
-            for error in errors:
-                print(f"error: {error}")
-            for warning in warnings:
-                print(f"warning: {warning}")
-
-        if errors:
-            errors_occurred = True
-            if args.fix and validator.fixable:
-                need_fixing = True
-                validator.fix(data)
+        cache = ResultCache()
+
+    if changed_only:
+        from .discovery import GitError, find_changed_projects
+
+        try:
+            paths = find_changed_projects(args.changed_since, staged=args.staged, paths=args.paths)
+        except GitError as e:
+            print(e)
+            sys.exit(1)
+
+        if not paths and not args.config:
+            from .reporters import get_reporter
+
+            print("no `pyproject.toml` files have changed", file=sys.stderr)
+            get_reporter(args.format).finish(0)
+            sys.exit(0)
+    elif args.recursive:
+        from .discovery import Discoverer
+
+        discoverer = Discoverer(cache.discovery_path if cache is not None else None)
+        paths = []
+        for path in args.paths or [os.getcwd()]:
+            if os.path.isdir(path):
+                paths.extend(discoverer.discover(path))
             else:
-                unfixable_errors = True
-                if validator.exit_early:
-                    break
+                paths.append(path)
+
+        discoverer.save()
+        if not paths:
+            print("could not locate any `pyproject.toml` files")
+            sys.exit(1)
+    elif args.files_from is not None:
+        if args.files_from == "-":
+            stream = sys.stdin.buffer
+        else:
+            try:
+                stream = open(args.files_from, "rb")
+            except OSError as e:
+                print(e)
+                sys.exit(1)
+
+        # There may be any number of paths so they are neither collected nor deduplicated
+        paths = stream_paths(args.paths, stream, args.config)
+    else:
+        paths = [resolve_path(path) for path in args.paths]
+
+    if args.files_from is None:
+        if args.config:
+            paths.append(args.config)
+
+        # Compare what paths refer to since concurrent fixes of the same file would conflict, keeping
+        # the first occurrence so that output order matches the command line
+        unique_paths = {}
+        for path in paths:
+            unique_paths.setdefault(os.path.realpath(path), path)
+
+        paths = list(unique_paths.values()) or [None]
+
+    timings = args.timings or bool(args.trace_file)
+    from .timings import NullTimer, Timer
+
+    timer = Timer() if timings else NullTimer()
+
+    with timer.span("run", "cli"):
+        exit_code, validated_paths = validate_paths(
+            paths,
+            args,
+            cache,
+            validators,
+            jobs=args.jobs,
+            timings=timings,
+            timer=timer,
+            multiple=True if args.files_from is not None else None,
+        )
+
+    if args.timings:
+        from .timings import summarize
+
+        for line in summarize(timer.spans):
+            print(line, file=sys.stderr)
+
+    if args.trace_file:
+        from .timings import write_trace
+
+        write_trace(args.trace_file, timer.spans)
 
-    if need_fixing and not unfixable_errors:
-        handler.save(data)
-        errors_occurred = False
+    if args.watch:
+        watch(validated_paths, args, cache, validators)
 
-    sys.exit(int(errors_occurred))
+    sys.exit(exit_code)
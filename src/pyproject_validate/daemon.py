@@ -0,0 +1,334 @@
+"""
+A resident process that keeps the validators, models and parsers imported so that invocations
+forwarded to it skip interpreter startup and import costs entirely.
+
+The protocol is a single line of JSON in each direction per connection. Requests are handled one
+at a time because they change the working directory and the environment of the daemon to those of
+the client.
+"""
+from __future__ import annotations
+
+import os
+import sys
+from typing import Any, Dict, List, Optional, Tuple
+
+# Set in the daemon itself so that the invocations it handles run in-process
+DISABLE_ENV_VAR = "PYPROJECT_VALIDATE_NO_DAEMON"
+SOCKET_ENV_VAR = "PYPROJECT_VALIDATE_SOCKET"
+# Besides these, all variables with the prefix are forwarded from the client
+FORWARDED_ENV_VARS = ("HOME", "XDG_CACHE_HOME")
+FORWARDED_ENV_PREFIX = "PYPROJECT_VALIDATE_"
+
+
+def is_supported() -> bool:
+    return sys.platform != "win32"
+
+
+def get_socket_path() -> str:
+    path = os.environ.get(SOCKET_ENV_VAR)
+    if path:
+        return path
+
+    # The runtime directory is private to the user
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        return os.path.join(runtime_dir, f"pyproject-validate-{os.getuid()}.sock")
+
+    # Otherwise a private directory is created within the shared temporary directory by the daemon.
+    # This runs before every invocation so the default of Unix is used rather than importing `tempfile`.
+    temp_dir = os.environ.get("TMPDIR") or "/tmp"
+    return os.path.join(temp_dir, f"pyproject-validate-{os.getuid()}", "daemon.sock")
+
+
+def _is_trusted(path: str) -> bool:
+    """
+    Whether `path` is a socket owned by the current user, since otherwise another user could have
+    created it to receive the invocations and answer them.
+    """
+    import stat
+
+    try:
+        st = os.lstat(path)
+    except OSError:
+        return False
+
+    return stat.S_ISSOCK(st.st_mode) and st.st_uid == os.getuid()
+
+
+def _make_private_directory(path: str):
+    import stat
+
+    try:
+        os.mkdir(path, 0o700)
+    except FileExistsError:
+        pass
+
+    st = os.lstat(path)
+    if not stat.S_ISDIR(st.st_mode) or st.st_uid != os.getuid() or st.st_mode & 0o077:
+        raise OSError(f"refusing to use {path} as it is not a directory that only the current user may access")
+
+
+def _get_forwarded_env() -> Dict[str, str]:
+    return {
+        name: value
+        for name, value in os.environ.items()
+        if name in FORWARDED_ENV_VARS
+        or (name.startswith(FORWARDED_ENV_PREFIX) and name not in (DISABLE_ENV_VAR, SOCKET_ENV_VAR))
+    }
+
+
+def _connect(path: str, timeout: Optional[float] = 1):
+    import socket
+
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        client.settimeout(timeout)
+        client.connect(path)
+    except OSError:
+        client.close()
+        raise
+
+    # Validation of many files may take arbitrarily long
+    client.settimeout(None)
+    return client
+
+
+def _send(connection, message: Dict[str, Any]):
+    import json
+
+    connection.sendall(json.dumps(message).encode("utf-8") + b"\n")
+
+
+def _receive(connection) -> Dict[str, Any]:
+    import json
+
+    with connection.makefile("rb") as f:
+        return json.loads(f.readline())
+
+
+def _call(path: str, message: Dict[str, Any]) -> Dict[str, Any]:
+    with _connect(path) as client:
+        _send(client, message)
+        return _receive(client)
+
+
+def _get_identity() -> Dict[str, str]:
+    # Daemons of other installations or versions would validate differently
+    from ._version import version
+
+    return {"version": version, "executable": sys.executable, "prefix": sys.prefix}
+
+
+def forward(argv: List[str]) -> Optional[Tuple[int, str, str]]:
+    """
+    Sends the invocation to a running daemon, returning the exit code, stdout and stderr,
+    or `None` if no daemon is available in which case the caller should run in-process.
+    """
+    if not is_supported() or os.environ.get(DISABLE_ENV_VAR):
+        return None
+
+    path = get_socket_path()
+    if not _is_trusted(path):
+        return None
+
+    try:
+        response = _call(
+            path, {"argv": argv, "cwd": os.getcwd(), "env": _get_forwarded_env(), "identity": _get_identity()}
+        )
+    except (OSError, ValueError):
+        return None
+
+    if response.get("status") == "mismatch":
+        return None
+
+    return response["code"], response["stdout"], response["stderr"]
+
+
+def _preload():
+    # Everything that would otherwise be imported lazily by the first request
+    import packaging.requirements  # noqa: F401
+    import tomli_w  # noqa: F401
+
+    from . import cache, engine, models  # noqa: F401
+    from .handlers import get_toml_backend
+    from .validators import dependencies, naming, specs  # noqa: F401
+
+    # The parser of the default backend
+    get_toml_backend().loads("")
+
+
+def _apply_env(env: Dict[str, str]) -> Dict[str, Optional[str]]:
+    """
+    Makes the forwarded variables of the client those of the daemon, returning the previous values.
+    """
+    names = set(env)
+    names.update(name for name in os.environ if name in FORWARDED_ENV_VARS or name.startswith(FORWARDED_ENV_PREFIX))
+    names.difference_update((DISABLE_ENV_VAR, SOCKET_ENV_VAR))
+
+    previous = {}
+    for name in names:
+        previous[name] = os.environ.get(name)
+        value = env.get(name)
+        if value is None:
+            os.environ.pop(name, None)
+        else:
+            os.environ[name] = value
+
+    return previous
+
+
+def _restore_env(previous: Dict[str, Optional[str]]):
+    for name, value in previous.items():
+        if value is None:
+            os.environ.pop(name, None)
+        else:
+            os.environ[name] = value
+
+
+def _handle(argv: List[str], cwd: str, env: Dict[str, str]) -> Dict[str, Any]:
+    from contextlib import redirect_stderr, redirect_stdout
+    from io import StringIO
+
+    from .cli import main
+
+    stdout = StringIO()
+    stderr = StringIO()
+    original_cwd = os.getcwd()
+    original_argv = sys.argv
+    original_env = _apply_env(env)
+    code: Any = 0
+    try:
+        os.chdir(cwd)
+        sys.argv = ["pyproject-validate", *argv]
+        with redirect_stdout(stdout), redirect_stderr(stderr):
+            try:
+                main()
+            except SystemExit as e:
+                code = e.code
+            except Exception:
+                import traceback
+
+                traceback.print_exc()
+                code = 1
+    except OSError as e:
+        stderr.write(f"{e}\n")
+        code = 1
+    finally:
+        sys.argv = original_argv
+        os.chdir(original_cwd)
+        _restore_env(original_env)
+
+    if code is None:
+        code = 0
+    elif not isinstance(code, int):
+        stderr.write(f"{code}\n")
+        code = 1
+
+    return {"code": code, "stdout": stdout.getvalue(), "stderr": stderr.getvalue()}
+
+
+def _parse_invocation(request: Any) -> Optional[Tuple[List[str], str, Dict[str, str]]]:
+    """
+    Returns the arguments, working directory and environment of a forwarded invocation or `None`
+    if the request is malformed.
+    """
+    if not isinstance(request, dict):
+        return None
+
+    argv = request.get("argv")
+    cwd = request.get("cwd")
+    env = request.get("env", {})
+    if (
+        not isinstance(argv, list)
+        or not all(isinstance(arg, str) for arg in argv)
+        or not isinstance(cwd, str)
+        or not isinstance(env, dict)
+        or not all(isinstance(name, str) and isinstance(value, str) for name, value in env.items())
+    ):
+        return None
+
+    return argv, cwd, env
+
+
+def is_running(path: str) -> bool:
+    if not _is_trusted(path):
+        return False
+
+    try:
+        response = _call(path, {"command": "ping"})
+    except (OSError, ValueError):
+        return False
+
+    return response.get("status") == "ok"
+
+
+def stop(path: str) -> bool:
+    if not _is_trusted(path):
+        return False
+
+    try:
+        _call(path, {"command": "stop"})
+    except (OSError, ValueError):
+        return False
+
+    return True
+
+
+def serve(path: str):
+    import socket
+
+    if is_running(path):
+        raise OSError(f"a daemon is already listening on {path}")
+
+    if not os.environ.get(SOCKET_ENV_VAR) and not os.environ.get("XDG_RUNTIME_DIR"):
+        _make_private_directory(os.path.dirname(path))
+
+    # Left over from a daemon that did not shut down cleanly
+    if os.path.lexists(path):
+        os.remove(path)
+
+    os.environ[DISABLE_ENV_VAR] = "1"
+    _preload()
+    identity = _get_identity()
+
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    original_umask = os.umask(0o177)
+    try:
+        server.bind(path)
+    finally:
+        os.umask(original_umask)
+
+    try:
+        server.listen()
+        while True:
+            connection, _ = server.accept()
+            with connection:
+                try:
+                    request = _receive(connection)
+                except (OSError, ValueError):
+                    continue
+
+                command = request.get("command") if isinstance(request, dict) else None
+                if command == "stop":
+                    _send(connection, {"status": "ok"})
+                    break
+                elif command == "ping":
+                    _send(connection, {"status": "ok"})
+                    continue
+
+                invocation = _parse_invocation(request)
+                if invocation is None:
+                    continue
+
+                # Clients of other installations run in-process instead
+                response = _handle(*invocation) if request.get("identity") == identity else {"status": "mismatch"}
+                try:
+                    _send(connection, response)
+                except OSError:  # no cov
+                    continue
+    finally:
+        server.close()
+        try:
+            os.remove(path)
+        except OSError:  # no cov
+            pass
@@ -0,0 +1,179 @@
+"""
+Diagnostics that refer to the key in the document they concern, with messages and source
+positions that are only computed when something asks for them.
+"""
+from __future__ import annotations
+
+import re
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+KeyPath = Tuple[Union[str, int], ...]
+# One-based line and column
+Position = Tuple[int, int]
+
+_BARE_KEY = re.compile(r"[A-Za-z0-9_-]+")
+
+
+def format_key_path(path: Sequence[Union[str, int]]) -> str:
+    """
+    Renders a key path like `project.optional-dependencies.foo[2]`, quoting keys that are not
+    bare keys in TOML.
+    """
+    parts: List[str] = []
+    for key in path:
+        if isinstance(key, int):
+            parts.append(f"[{key}]")
+            continue
+
+        if not _BARE_KEY.fullmatch(key):
+            escaped = key.replace("\\", "\\\\").replace('"', '\\"')
+            key = f'"{escaped}"'
+
+        parts.append(f".{key}" if parts else key)
+
+    return "".join(parts)
+
+
+class SourceMap:
+    """
+    Maps key paths to positions in the text of a document. The text may be given as a callable
+    so that it is only decoded if a position is requested, and the document is scanned and the
+    offsets of lines are indexed once, on the first request.
+    """
+
+    __slots__ = ("_text", "_offsets", "_line_starts")
+
+    def __init__(self, text: Union[str, Callable[[], str]]):
+        self._text = text
+        self._offsets: Optional[Dict[KeyPath, int]] = None
+        self._line_starts: List[int] = []
+
+    def _index(self) -> Dict[KeyPath, int]:
+        from .spans import ScanError, Scanner
+
+        text = self._text if isinstance(self._text, str) else self._text()
+        self._line_starts = [0]
+        self._line_starts.extend(match.end() for match in re.finditer("\n", text))
+
+        scanner = Scanner(text)
+        try:
+            scanner.scan()
+        except ScanError:
+            # Keep whatever was found before the unsupported syntax
+            pass
+
+        offsets = {path: start for path, (start, _) in scanner.tables.items()}
+        offsets.update((path, start) for path, (start, _) in scanner.spans.items())
+        self._offsets = offsets
+        self._text = ""
+        return offsets
+
+    def locate(self, path: KeyPath) -> Optional[Position]:
+        """
+        Returns the position of the value at `path`, or of the closest enclosing value that was
+        found, or of the first value within it if it is a table that was never declared itself.
+        """
+        offsets = self._offsets if self._offsets is not None else self._index()
+
+        offset = None
+        for end in range(len(path), 0, -1):
+            offset = offsets.get(path[:end])
+            if offset is not None:
+                break
+        else:
+            size = len(path)
+            descendants = [start for key, start in offsets.items() if key[:size] == path]
+            if descendants:
+                offset = min(descendants)
+
+        if offset is None:
+            return None
+
+        from bisect import bisect_right
+
+        line = bisect_right(self._line_starts, offset)
+        return line, offset - self._line_starts[line - 1] + 1
+
+
+def _restore(path: KeyPath, message: str, position: Optional[Position]) -> Diagnostic:
+    diagnostic = Diagnostic(path, message)
+    diagnostic._position = position
+    return diagnostic
+
+
+_UNRESOLVED: Any = object()
+
+
+class Diagnostic:
+    """
+    A message concerning the value at a key path of the document. The message is rendered from
+    `template` with `str.format` only when first requested, and the position only when first
+    requested if a source map is attached.
+    """
+
+    __slots__ = ("path", "_template", "_args", "_message", "source", "_position")
+
+    def __init__(self, path: KeyPath, template: str, *args: Any):
+        self.path = path
+        self._template = template
+        self._args = args
+        self._message: Optional[str] = None if args else template
+        self.source: Optional[SourceMap] = None
+        self._position: Optional[Position] = _UNRESOLVED
+
+    @property
+    def message(self) -> str:
+        if self._message is None:
+            self._message = self._template.format(*self._args)
+            # Do not keep objects like exceptions alive
+            self._args = ()
+
+        return self._message
+
+    @property
+    def position(self) -> Optional[Position]:
+        if self._position is _UNRESOLVED:
+            self._position = self.source.locate(self.path) if self.source is not None else None
+
+        return self._position
+
+    @property
+    def line(self) -> Optional[int]:
+        position = self.position
+        return position[0] if position is not None else None
+
+    @property
+    def column(self) -> Optional[int]:
+        position = self.position
+        return position[1] if position is not None else None
+
+    @property
+    def key(self) -> str:
+        return format_key_path(self.path)
+
+    def dump(self) -> List[Any]:
+        return [self.message, list(self.path)]
+
+    @classmethod
+    def load(cls, data: List[Any]) -> Diagnostic:
+        message, path = data
+        return cls(tuple(path), message)
+
+    def __str__(self) -> str:
+        return self.message
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Diagnostic):
+            return NotImplemented
+
+        return self.path == other.path and self.message == other.message
+
+    def __hash__(self) -> int:
+        return hash((self.path, self.message))
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        # Source maps are not sent to other processes so positions are resolved before if possible
+        return _restore, (self.path, self.message, self.position)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.key!r}, {self.message!r})"
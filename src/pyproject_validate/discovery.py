@@ -0,0 +1,391 @@
+from __future__ import annotations
+
+import os
+import re
+import time
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+# Directories which never contain projects of interest
+PRUNED_DIRECTORIES = frozenset(
+    (
+        ".git",
+        ".hg",
+        ".svn",
+        ".hatch",
+        ".mypy_cache",
+        ".nox",
+        ".pytest_cache",
+        ".ruff_cache",
+        ".tox",
+        ".venv",
+        "__pycache__",
+        "node_modules",
+        "site-packages",
+        "venv",
+    )
+)
+PROJECT_FILE = "pyproject.toml"
+IGNORE_FILE = ".gitignore"
+
+MAX_CACHED_ROOTS = 16
+READ_CHUNK_SIZE = 64 * 1024
+RACY_INTERVAL = 2_000_000_000
+
+# directory modification time, ignore file modification time, subdirectories, whether the directory
+# contains a project file, and the lines of the ignore file
+CacheEntry = Tuple[int, Optional[int], List[str], bool, List[str]]
+
+
+def _translate(pattern: str) -> str:
+    parts = []
+    i = 0
+    length = len(pattern)
+    while i < length:
+        char = pattern[i]
+        if pattern.startswith("**/", i):
+            parts.append("(?:.*/)?")
+            i += 3
+        elif pattern.startswith("**", i):
+            parts.append(".*")
+            i += 2
+        elif char == "*":
+            parts.append("[^/]*")
+            i += 1
+        elif char == "?":
+            parts.append("[^/]")
+            i += 1
+        elif char == "[":
+            end = pattern.find("]", i + 2)
+            if end == -1:
+                parts.append(re.escape(char))
+                i += 1
+            else:
+                contents = pattern[i + 1 : end].replace("\\", "\\\\")
+                if contents.startswith("!"):
+                    contents = f"^{contents[1:]}"
+
+                parts.append(f"[{contents}]")
+                i = end + 1
+        elif char == "\\" and i + 1 < length:
+            parts.append(re.escape(pattern[i + 1]))
+            i += 2
+        else:
+            parts.append(re.escape(char))
+            i += 1
+
+    return "".join(parts)
+
+
+class IgnoreRule:
+    __slots__ = ("base", "regex", "negated", "directory_only", "anchored")
+
+    def __init__(self, base: str, pattern: str):
+        self.base = base
+        self.negated = pattern.startswith("!")
+        if self.negated:
+            pattern = pattern[1:]
+
+        self.directory_only = pattern.endswith("/")
+        pattern = pattern.rstrip("/")
+
+        # Patterns with a separator anywhere but the end are relative to the ignore file
+        self.anchored = "/" in pattern
+        self.regex = re.compile(f"{_translate(pattern.lstrip('/'))}\\Z", re.DOTALL)
+
+    def matches(self, relative_path: str, name: str, is_directory: bool) -> bool:
+        if self.directory_only and not is_directory:
+            return False
+
+        if not self.anchored:
+            return self.regex.match(name) is not None
+
+        if self.base:
+            if not relative_path.startswith(f"{self.base}/"):
+                return False
+
+            relative_path = relative_path[len(self.base) + 1 :]
+
+        return self.regex.match(relative_path) is not None
+
+
+def parse_ignore_lines(base: str, lines: List[str]) -> List[IgnoreRule]:
+    rules = []
+    for line in lines:
+        # Trailing spaces are ignored unless escaped
+        if not line.endswith("\\ "):
+            line = line.rstrip(" ")
+
+        if not line or line.startswith("#"):
+            continue
+
+        rules.append(IgnoreRule(base, line))
+
+    return rules
+
+
+def is_ignored(rules: List[IgnoreRule], relative_path: str, name: str, is_directory: bool) -> bool:
+    # The last matching rule takes precedence
+    for rule in reversed(rules):
+        if rule.matches(relative_path, name, is_directory):
+            return not rule.negated
+
+    return False
+
+
+def _stat_mtime(path: str) -> Optional[int]:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _scan_directory(path: str) -> Optional[CacheEntry]:
+    mtime = _stat_mtime(path)
+    if mtime is None:
+        return None
+
+    subdirectories = []
+    has_project = False
+    has_ignore_file = False
+    is_virtual_environment = False
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                name = entry.name
+                if name == PROJECT_FILE:
+                    has_project = entry.is_file()
+                elif name == IGNORE_FILE:
+                    has_ignore_file = True
+                elif name == "pyvenv.cfg":
+                    is_virtual_environment = True
+                elif name not in PRUNED_DIRECTORIES and entry.is_dir(follow_symlinks=False):
+                    subdirectories.append(name)
+    except OSError:
+        return None
+
+    if is_virtual_environment:
+        return mtime, None, [], False, []
+
+    ignore_mtime = None
+    ignore_lines: List[str] = []
+    if has_ignore_file:
+        ignore_path = os.path.join(path, IGNORE_FILE)
+        ignore_mtime = _stat_mtime(ignore_path)
+        try:
+            with open(ignore_path, "r", encoding="utf-8", errors="replace") as f:
+                ignore_lines = f.read().splitlines()
+        except OSError:  # no cov
+            pass
+
+    # Changes within the granularity of the timestamps would go unnoticed so never trust recent listings
+    if time.time_ns() - mtime < RACY_INTERVAL:
+        mtime = -1
+
+    subdirectories.sort()
+    return mtime, ignore_mtime, subdirectories, has_project, ignore_lines
+
+
+class Discoverer:
+    """
+    Finds every project file below a root directory without descending into directories that
+    are version control metadata, dependencies, virtual environments or ignored by Git. Directory
+    listings are cached so that subsequent discovery only lists directories that have changed,
+    at the cost of a `stat` call per directory.
+    """
+
+    def __init__(self, cache_path: Optional[str] = None):
+        self.cache_path = cache_path
+        self._cache: Dict[str, Dict[str, Any]] = {}
+        self._modified = False
+        if cache_path is not None:
+            self._cache = self._read_cache(cache_path)
+
+    @staticmethod
+    def _read_cache(path: str) -> Dict[str, Dict[str, Any]]:
+        import json
+
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+        return cache if isinstance(cache, dict) else {}
+
+    def _entry(self, entries: Dict[str, Any], relative_path: str, path: str) -> Optional[CacheEntry]:
+        cached = entries.get(relative_path)
+        if cached is not None:
+            mtime, ignore_mtime = cached[0], cached[1]
+            # An ignore file that is modified in place does not change the directory's modification time
+            if _stat_mtime(path) == mtime and (
+                ignore_mtime is None or _stat_mtime(os.path.join(path, IGNORE_FILE)) == ignore_mtime
+            ):
+                return cached
+
+        entry = _scan_directory(path)
+        if entry is None:
+            entries.pop(relative_path, None)
+        else:
+            entries[relative_path] = list(entry)
+
+        self._modified = True
+        return entry
+
+    def discover(self, root: str) -> List[str]:
+        root = os.path.abspath(root)
+
+        # Keep the most recently used roots last so that the least recently used may be evicted
+        entries = self._cache.pop(root, {})
+        self._cache[root] = entries
+        while len(self._cache) > MAX_CACHED_ROOTS:
+            del self._cache[next(iter(self._cache))]
+            self._modified = True
+
+        seen = set()
+
+        projects = []
+        stack: List[Tuple[str, List[IgnoreRule]]] = [("", [])]
+        while stack:
+            relative_path, rules = stack.pop()
+            path = os.path.join(root, relative_path) if relative_path else root
+            entry = self._entry(entries, relative_path, path)
+            if entry is None:
+                continue
+
+            seen.add(relative_path)
+            _, _, subdirectories, has_project, ignore_lines = entry
+            if ignore_lines:
+                rules = rules + parse_ignore_lines(relative_path, ignore_lines)
+
+            if has_project and not is_ignored(
+                rules, f"{relative_path}/{PROJECT_FILE}".lstrip("/"), PROJECT_FILE, False
+            ):
+                projects.append(os.path.join(path, PROJECT_FILE))
+
+            # Reversed so that directories are visited in sorted order
+            for name in reversed(subdirectories):
+                child = f"{relative_path}/{name}" if relative_path else name
+                if not is_ignored(rules, child, name, True):
+                    stack.append((child, rules))
+
+        # Forget directories that no longer exist or are now pruned
+        for relative_path in set(entries) - seen:
+            del entries[relative_path]
+            self._modified = True
+
+        return projects
+
+    def save(self):
+        if self.cache_path is None or not self._modified:
+            return
+
+        import json
+
+        temp_path = f"{self.cache_path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(self._cache, f, separators=(",", ":"))
+
+            os.replace(temp_path, self.cache_path)
+        except OSError:  # no cov
+            pass
+
+        self._modified = False
+
+
+class GitError(Exception):
+    pass
+
+
+def _git(*args: str) -> str:
+    import subprocess
+
+    try:
+        process = subprocess.run(["git", *args], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    except OSError as e:
+        raise GitError(f"unable to run git: {e}") from None
+
+    if process.returncode:
+        message = process.stderr.decode("utf-8", "replace").strip()
+        raise GitError(message or f"git {args[0]} failed with exit code {process.returncode}")
+
+    return process.stdout.decode("utf-8", "surrogateescape")
+
+
+def find_changed_projects(
+    since: Optional[str] = None, staged: bool = False, paths: Optional[List[str]] = None
+) -> List[str]:
+    """
+    Returns the project files of the Git repository containing the current directory that differ
+    from the `since` revision, `HEAD` by default. Only staged changes are considered if `staged` is
+    set, otherwise changes in the working tree and untracked files are included. Deleted files are
+    never returned and the search may be limited to `paths`.
+    """
+    root = _git("rev-parse", "--show-toplevel").rstrip("\n")
+    pathspecs = ["--", *paths] if paths else []
+
+    # Paths are relative to the root of the repository and NUL-delimited to avoid quoting
+    command = ["diff", "--name-only", "-z", "--no-renames", "--diff-filter=d"]
+    if staged:
+        command.append("--cached")
+    command.append(since or "HEAD")
+    changed = _git(*command, *pathspecs).split("\0")
+
+    if not staged:
+        # The status entries of untracked files are `?? <path>`
+        for entry in _git("status", "--porcelain", "-z", "--untracked-files=all", *pathspecs).split("\0"):
+            if entry.startswith("?? "):
+                changed.append(entry[3:])
+
+    projects = []
+    for relative_path in changed:
+        if relative_path.rpartition("/")[2] == PROJECT_FILE:
+            projects.append(os.path.normpath(os.path.join(root, relative_path)))
+
+    projects.sort()
+    return projects
+
+
+def read_paths(stream: BinaryIO, chunk_size: int = READ_CHUNK_SIZE) -> Iterator[str]:
+    """
+    Lazily yields the paths in the `stream`, which are delimited by NUL characters if any are
+    read before or along with the first newline and otherwise by newlines. Empty entries are
+    skipped.
+    """
+    delimiter = None
+    remainder = b""
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+
+        buffer = remainder + chunk
+        if delimiter is None:
+            if b"\0" in buffer:
+                delimiter = b"\0"
+            elif b"\n" in buffer:
+                delimiter = b"\n"
+            else:
+                remainder = buffer
+                continue
+
+        entries = buffer.split(delimiter)
+        remainder = entries.pop()
+        for entry in entries:
+            path = _decode_path(entry, delimiter)
+            if path:
+                yield path
+
+    if remainder:
+        path = _decode_path(remainder, delimiter or b"\n")
+        if path:
+            yield path
+
+
+def _decode_path(entry: bytes, delimiter: bytes) -> str:
+    # Lists written on Windows
+    if delimiter == b"\n" and entry.endswith(b"\r"):
+        entry = entry[:-1]
+
+    return os.fsdecode(entry)
@@ -0,0 +1,388 @@
+from __future__ import annotations
+
+import os
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Set,
+    Sized,
+    Tuple,
+)
+
+from . import requirements
+from .diagnostics import Diagnostic, KeyPath, SourceMap
+from .handlers import Handler, get_handler, get_toml_backend
+from .timings import NullTimer, Span, Timer
+from .validators import REGISTRY, get_validators
+
+if TYPE_CHECKING:
+    from .cache import DocumentCache, ResultCache
+    from .validators import Validator
+
+# Fixes that still cause errors after this many passes are considered to conflict
+MAX_FIX_PASSES = 5
+# Paths per batch sent to a worker when the total number of paths is unknown
+STREAM_BATCH_SIZE = 16
+
+
+class ValidatorReport(NamedTuple):
+    name: str
+    errors: List[Diagnostic]
+    warnings: List[Diagnostic]
+    fixable: bool
+    exit_early: bool
+
+    def dump(self) -> List[Any]:
+        return [
+            self.name,
+            [error.dump() for error in self.errors],
+            [warning.dump() for warning in self.warnings],
+            self.fixable,
+            self.exit_early,
+        ]
+
+    @classmethod
+    def load(cls, data: List[Any]) -> ValidatorReport:
+        name, errors, warnings, fixable, exit_early = data
+        return cls(
+            name,
+            [Diagnostic.load(error) for error in errors],
+            [Diagnostic.load(warning) for warning in warnings],
+            fixable,
+            exit_early,
+        )
+
+    def attach(self, source: SourceMap):
+        for diagnostic in (*self.errors, *self.warnings):
+            diagnostic.source = source
+
+
+class FileResult(NamedTuple):
+    path: Optional[str]
+    code: int
+    reports: List[ValidatorReport]
+    # Set when the file could not be read or deserialized
+    error: Optional[str] = None
+    stored: bool = False
+    # Requirement normalizations computed while validating this file, for persisting by the caller
+    requirements: Optional[Dict[str, Tuple[Optional[str], Optional[str]]]] = None
+    spans: Optional[List[Span]] = None
+
+
+class Outcome(NamedTuple):
+    reports: List[ValidatorReport]
+    errors_occurred: bool
+    # Whether any fixes were applied to the data
+    need_fixing: bool
+    unfixable_errors: bool
+
+
+def resolve_path(path: str) -> str:
+    if os.path.isdir(path):
+        return os.path.join(path, "pyproject.toml")
+
+    return path
+
+
+def apply_validators(
+    data: Dict[str, Any], validators: Dict[str, Validator], fix: bool = False, timer: Timer | NullTimer | None = None
+) -> Outcome:
+    """
+    Runs the `validators` in order on the deserialized `data`, applying fixes to it in place if
+    `fix` is set.
+
+    Since fixes may cause other validators to fail, validation is repeated until no more fixes
+    are applied, for at most `MAX_FIX_PASSES` passes. Every subsequent pass only runs the
+    validators that read any of the sections modified by the previous one. If fixes do not
+    converge then they are considered unfixable. The reports are those of the first pass, which
+    describe the original data.
+    """
+    if timer is None:
+        timer = NullTimer()
+
+    outcome, modified = _validation_pass(data, validators, fix, timer)
+    if not outcome.need_fixing or outcome.unfixable_errors:
+        return outcome
+
+    reports = list(outcome.reports)
+    for _ in range(MAX_FIX_PASSES - 1):
+        affected = {name: validator for name, validator in validators.items() if _reads(name, modified)}
+        if not affected:
+            return outcome
+
+        with timer.span("revalidate", "fix"):
+            rerun, modified = _validation_pass(data, affected, fix, timer)
+
+        if rerun.unfixable_errors:
+            # Report what prevents the fixed data from being valid
+            reports.extend(report for report in rerun.reports if report.errors and not report.fixable)
+            return outcome._replace(reports=reports, unfixable_errors=True)
+        elif not rerun.need_fixing:
+            return outcome
+
+    message = Diagnostic((), "fixes did not converge after {} passes", MAX_FIX_PASSES)
+    reports.append(ValidatorReport("fix", [message], [], False, False))
+    return outcome._replace(reports=reports, unfixable_errors=True)
+
+
+def _reads(name: str, modified: Set[KeyPath]) -> bool:
+    sections = REGISTRY[name].sections
+    if not sections:
+        return True
+
+    for section in sections:
+        section_path = tuple(section.split("."))
+        for path in modified:
+            # Either may contain the other
+            size = min(len(path), len(section_path))
+            if path[:size] == section_path[:size]:
+                return True
+
+    return False
+
+
+def _validation_pass(
+    data: Dict[str, Any], validators: Dict[str, Validator], fix: bool, timer: Timer | NullTimer
+) -> Tuple[Outcome, Set[KeyPath]]:
+    reports = []
+    errors_occurred = False
+    unfixable_errors = False
+    need_fixing = False
+    # Key paths of the values that were fixed
+    modified: Set[KeyPath] = set()
+    # Validators that failed, or were skipped because a dependency failed
+    blocked = set()
+    for name, validator in validators.items():
+        entry = REGISTRY[name]
+        if not entry.applies(data):
+            continue
+
+        if any(dependency in blocked for dependency in entry.depends):
+            blocked.add(name)
+            continue
+
+        with timer.span(f"validate:{name}", "validate"):
+            result = validator.validate(data)
+
+        reports.append(ValidatorReport(name, result.errors, result.warnings, result.fixable, result.exit_early))
+
+        if result.errors:
+            errors_occurred = True
+            if fix and result.fixable:
+                need_fixing = True
+                with timer.span(f"fix:{name}", "fix"):
+                    result.fix(data)
+
+                modified.update(result.fixes)
+            else:
+                unfixable_errors = True
+                if result.exit_early:
+                    blocked.add(name)
+
+    return Outcome(reports, errors_occurred, need_fixing, unfixable_errors), modified
+
+
+def validate_file(
+    path: Optional[str],
+    fix: bool = False,
+    cache: Optional[ResultCache] = None,
+    timings: bool = False,
+    validators: Optional[Sequence[str]] = None,
+    locate: bool = False,
+    documents: Optional[DocumentCache] = None,
+    toml_backend: Optional[str] = None,
+) -> FileResult:
+    """
+    Runs the entire validation pipeline for a single file, returning the exit code and the
+    reports rather than printing them so that the work may happen in another process.
+
+    If `locate` is set then the source positions of diagnostics may be requested, which are
+    computed from the original contents of the file on first request. Deserialized documents
+    are cached in `documents` if given. The name of the TOML backend to use may be given as
+    `toml_backend`, otherwise the fastest one available is used.
+    """
+    timer = Timer(path) if timings else NullTimer()
+    handler = get_handler(path, documents=documents, backend=get_toml_backend(toml_backend))
+    try:
+        result = _validate_file(handler, path, fix, cache, timer, validators, locate, documents)
+    finally:
+        # Diagnostics may be held for much longer than this file is being validated
+        handler.close()
+
+    if timings:
+        result = result._replace(spans=timer.spans)
+
+    return result
+
+
+def _validate_file(
+    handler: Handler,
+    path: Optional[str],
+    fix: bool,
+    cache: Optional[ResultCache],
+    timer: Timer | NullTimer,
+    validator_names: Optional[Sequence[str]],
+    locate: bool,
+    documents: Optional[DocumentCache],
+) -> FileResult:
+    validators = get_validators(validator_names)
+
+    try:
+        # Report the file that was found when none was given
+        with timer.span("discover", "io"):
+            path = handler.path
+
+        # Hits of the document cache need not read the file at all
+        if cache is not None or documents is None:
+            with timer.span("read", "io"):
+                content = handler.read_bytes()
+    except Exception as e:
+        return FileResult(path, 1, [], str(e))
+
+    key = None
+    if cache is not None:
+        with timer.span("cache", "cache"):
+            key = cache.key(content, validators)
+            cached = cache.get(key)
+
+        if cached is not None:
+            reports = [ValidatorReport.load(report) for report in cached]
+
+            # Applying fixes requires the deserialized data so only errors may be replayed
+            if not (fix and any(report.errors for report in reports)):
+                if locate:
+                    source = SourceMap(handler.text_source())
+                    for report in reports:
+                        report.attach(source)
+
+                errors_occurred = any(report.errors for report in reports)
+                return FileResult(path, int(errors_occurred), reports)
+
+    try:
+        with timer.span("load", "parse"):
+            data = handler.load()
+    except Exception as e:
+        return FileResult(path, 1, [], str(e))
+
+    if cache is not None:
+        requirements.seed(cache.requirements_path)
+
+    reports, errors_occurred, need_fixing, unfixable_errors = apply_validators(data, validators, fix, timer)
+    if locate:
+        # The text is decoded again only if a position is requested, and before saving any fixes
+        source = SourceMap(handler.read() if need_fixing else handler.text_source())
+        for report in reports:
+            report.attach(source)
+
+    # Once fixes are applied subsequent validators see modified data, so the results no longer
+    # correspond to the original file contents
+    stored = False
+    if key is not None and not need_fixing:
+        with timer.span("cache", "cache"):
+            cache.set(key, [report.dump() for report in reports])  # type: ignore[union-attr]
+
+        stored = True
+
+    if need_fixing and not unfixable_errors:
+        with timer.span("save", "io"):
+            handler.save(data)
+
+        errors_occurred = False
+
+    new_requirements = requirements.drain()
+    return FileResult(
+        path, int(errors_occurred), reports, None, stored, new_requirements if cache is not None else None
+    )
+
+
+def _validate_batch(paths: List[Optional[str]], **kwargs: Any) -> List[FileResult]:
+    return [validate_file(path, **kwargs) for path in paths]
+
+
+def _batches(paths: Iterable[Optional[str]], size: int) -> Iterator[List[Optional[str]]]:
+    batch = []
+    for path in paths:
+        batch.append(path)
+        if len(batch) == size:
+            yield batch
+            batch = []
+
+    if batch:
+        yield batch
+
+
+def run(
+    paths: Iterable[Optional[str]],
+    fix: bool = False,
+    jobs: Optional[int] = None,
+    cache: Optional[ResultCache] = None,
+    timings: bool = False,
+    validators: Optional[Sequence[str]] = None,
+    locate: bool = False,
+    documents: Optional[DocumentCache] = None,
+    toml_backend: Optional[str] = None,
+) -> Iterator[FileResult]:
+    """
+    Validates every path, yielding results in the same order as the input regardless of
+    which worker process finished first.
+
+    The `paths` may be an iterator of unknown length, which is consumed lazily. Only a bounded
+    number of batches are ever in flight so memory usage does not grow with the number of paths,
+    and consumption stalls whenever the results are not being consumed.
+    """
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+
+    if isinstance(paths, Sized):
+        jobs = min(jobs, len(paths))
+        # Amortize the IPC overhead while still giving every worker a few batches to balance load
+        batch_size = max(1, len(paths) // (jobs * 4)) if jobs else 1
+    else:
+        batch_size = STREAM_BATCH_SIZE
+
+    if jobs < 2:
+        for path in paths:
+            yield validate_file(path, fix, cache, timings, validators, locate, documents, toml_backend)
+
+        return
+
+    from collections import deque
+    from concurrent.futures import Future, ProcessPoolExecutor
+    from functools import partial
+
+    validate = partial(
+        _validate_batch,
+        fix=fix,
+        cache=cache,
+        timings=timings,
+        validators=validators,
+        locate=locate,
+        documents=documents,
+        toml_backend=toml_backend,
+    )
+    initializer = None
+    initargs: Tuple[Any, ...] = ()
+    if cache is not None:
+        # Read once here rather than by every worker
+        initializer = requirements.seed
+        initargs = (cache.requirements_path, requirements.read(cache.requirements_path))
+
+    pending: Deque[Future] = deque()
+    with ProcessPoolExecutor(max_workers=jobs, initializer=initializer, initargs=initargs) as executor:
+        for batch in _batches(paths, batch_size):
+            # Keep every worker busy with the next batch already queued
+            if len(pending) >= jobs * 2:
+                yield from pending.popleft().result()
+
+            pending.append(executor.submit(validate, batch))
+
+        while pending:
+            yield from pending.popleft().result()
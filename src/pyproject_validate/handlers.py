@@ -1,13 +1,117 @@
 from __future__ import annotations
 
 import os
+import stat
+import sys
 from abc import ABC, abstractmethod
-from typing import Any, Dict, Optional
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional, Tuple, Type, Union
+
+if TYPE_CHECKING:
+    from mmap import mmap
+
+    from .cache import DocumentCache
+
+# Files at least this large are memory-mapped rather than read into memory, so that hashing and
+# decoding work directly off the page cache without an intermediate copy
+MMAP_THRESHOLD = 1024 * 1024
+
+
+class TOMLBackend:
+    """
+    Deserializes with the `loads` function of `module`, which must also define `TOMLDecodeError`,
+    and serializes with `tomli_w`, the only library that is able to.
+    """
+
+    name = ""
+    module = ""
+
+    @classmethod
+    def available(cls) -> bool:
+        from importlib.util import find_spec
+
+        return find_spec(cls.module) is not None
+
+    def _module(self) -> Any:
+        from importlib import import_module
+
+        return import_module(self.module)
+
+    @property
+    def error(self) -> Type[Exception]:
+        return self._module().TOMLDecodeError
+
+    def loads(self, text: str) -> Dict[str, Any]:
+        return self._module().loads(text)
+
+    def dumps(self, data: Dict[str, Any]) -> str:
+        import tomli_w
+
+        return tomli_w.dumps(data)
+
+
+class TomllibBackend(TOMLBackend):
+    name = "tomllib"
+    module = "tomllib"
+
+    @classmethod
+    def available(cls) -> bool:
+        return sys.version_info >= (3, 11)
+
+
+class TomliBackend(TOMLBackend):
+    name = "tomli"
+    module = "tomli"
+
+
+# In order of preference. Distributions of `tomli` are compiled with mypyc and parse several times
+# faster than `tomllib`, which is otherwise the same code, so it is preferred whenever installed.
+TOML_BACKENDS: Dict[str, Type[TOMLBackend]] = {"tomli": TomliBackend, "tomllib": TomllibBackend}
+
+_default_backend: Optional[TOMLBackend] = None
+
+
+def get_toml_backend(name: Optional[str] = None) -> TOMLBackend:
+    """
+    Returns the named backend, or the first one that is available. Unknown or unavailable backends
+    raise a `ValueError`.
+    """
+    global _default_backend
+
+    if name is None:
+        if _default_backend is None:
+            for backend in TOML_BACKENDS.values():
+                if backend.available():
+                    _default_backend = backend()
+                    break
+            else:
+                raise ValueError("no TOML backend is available, install `tomli`")
+
+        return _default_backend
+
+    backend = TOML_BACKENDS.get(name)
+    if backend is None:
+        raise ValueError(f"unknown TOML backend: {name}")
+    elif not backend.available():
+        raise ValueError(f"TOML backend is not available: {name}")
+
+    return backend()
 
 
 class Handler(ABC):
-    def __init__(self, path: Optional[str] = None):
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        content: Optional[bytes] = None,
+        documents: Optional[DocumentCache] = None,
+        backend: Optional[TOMLBackend] = None,
+    ):
         self._path = path
+        # May be provided to work with documents that are not files
+        self._content: Optional[Union[bytes, mmap]] = content
+        # The status of the file when it was read
+        self._stat: Optional[os.stat_result] = None
+        self.documents = documents
+        self.backend = backend if backend is not None else get_toml_backend()
 
     @property
     def path(self):
@@ -27,39 +131,296 @@ class Handler(ABC):
 
         return self._path
 
+    def read_bytes(self) -> Union[bytes, mmap]:
+        # The same buffer is used both for cache keys and deserialization so only read once
+        if self._content is None:
+            with open(self.path, "rb") as f:
+                self._stat = os.fstat(f.fileno())
+                size = self._stat.st_size
+                if size and size >= MMAP_THRESHOLD:
+                    import mmap
+
+                    self._content = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                else:
+                    self._content = f.read()
+
+        return self._content
+
     def read(self) -> str:
-        with open(self.path, "r", encoding="utf-8") as f:
-            return f.read()
+        return decode_text(self.read_bytes())
+
+    def text_source(self) -> Union[str, Callable[[], str]]:
+        """
+        Returns the text or, if it was not already mapped into memory, a callable that decodes it on
+        demand. Neither keeps the handler nor the mapping alive, so they may be held for as long as
+        diagnostics are.
+        """
+        from functools import partial
+
+        content = self._content
+        if content is None:
+            return partial(_read_text, self.path)
+        elif isinstance(content, bytes):
+            return partial(decode_text, content)
+
+        return self.read()
+
+    def close(self):
+        """
+        Releases the mapping of the file into memory, if any.
+        """
+        if self._content is not None and not isinstance(self._content, bytes):
+            self._content.close()
+            self._content = None
 
     def write(self, text: str):
-        with open(self.path, "w", encoding="utf-8") as f:
-            f.write(text)
+        # Match the newline translation of writing files as text
+        if os.linesep != "\n":  # no cov
+            text = text.replace("\n", os.linesep)
+
+        content = text.encode("utf-8")
+
+        # Avoid needlessly modifying the file, which would invalidate caches of build tools
+        if self._content is not None and len(content) == len(self._content):
+            with memoryview(self._content) as view:
+                if view == content:
+                    return
+
+        # Mapped files cannot be replaced on Windows
+        self.close()
+
+        # Write to a temporary file in the same directory and then move it into place so that readers
+        # never see partial contents, even if we crash. Resolve symbolic links to avoid replacing them.
+        import tempfile
+
+        path = os.path.realpath(self.path)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".pyproject-validate-", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(content)
+                f.flush()
+                os.fsync(f.fileno())
+
+            try:
+                mode = stat.S_IMODE(os.stat(path).st_mode)
+            except OSError:
+                mode = 0o644
+
+            os.chmod(temp_path, mode)
+            os.replace(temp_path, path)
+        except BaseException:
+            try:
+                os.remove(temp_path)
+            except OSError:  # no cov
+                pass
+
+            raise
+
+        self._content = content
 
-    @abstractmethod
     def load(self) -> Dict[str, Any]:
         """
         Deserializes the pyproject.toml file.
         """
+        if self.documents is None:
+            return self.parse()
+
+        return self._load_cached(self.documents)
 
     @abstractmethod
+    def parse(self) -> Dict[str, Any]:
+        """
+        Deserializes the pyproject.toml file, bypassing any cache of documents.
+        """
+
+    def _load_cached(self, documents: DocumentCache) -> Dict[str, Any]:
+        stat = self._stat
+        if stat is None:
+            # Documents that are not files
+            if self._content is not None:
+                return self.parse()
+
+            try:
+                stat = os.stat(self.path)
+            except OSError:
+                return self.parse()
+
+        key = documents.key(self.path, stat)
+        data = documents.get(key)
+        if data is not None:
+            return data
+
+        data = self.parse()
+
+        # Only store if the file that was read is the one that was looked up
+        if self._stat is not None and documents.identity(self._stat) == documents.identity(stat):
+            documents.set(key, data, stat)
+
+        return data
+
+    @abstractmethod
+    def dumps(self, data: Dict[str, Any]) -> str:
+        """
+        Serializes the `data` to the text of a pyproject.toml file.
+        """
+
     def save(self, data: Dict[str, Any]):
         """
         Serializes the `data` to the pyproject.toml file.
         """
+        self.write(self.dumps(data))
 
 
 class StandardHandler(Handler):
+    def parse(self):
+        return self.backend.loads(self.read())
+
+    def dumps(self, data):
+        return self.backend.dumps(data)
+
+
+class FormatPreservingHandler(StandardHandler):
+    """
+    Rewrites only the values that were modified by fixes, preserving comments and the formatting
+    of everything else. Serialization of the entire document is used as a fallback whenever any
+    other part of the project metadata was modified or the source could not be mapped. Fixes only
+    ever modify the project metadata so other tables are not compared, which would be costly for
+    large documents.
+    """
+
+    # The only values that fixes may modify, with optional dependencies patched per group
+    PATCHABLE_KEYS = ("name", "dependencies", "optional-dependencies")
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        content: Optional[bytes] = None,
+        documents: Optional[DocumentCache] = None,
+        backend: Optional[TOMLBackend] = None,
+    ):
+        super().__init__(path, content, documents, backend)
+
+        # The project metadata as it is in the source
+        self._original: Optional[Dict[str, Any]] = None
+
+    def _remember(self, data: Dict[str, Any]):
+        project = data.get("project")
+        if isinstance(project, dict):
+            from copy import deepcopy
+
+            self._original = deepcopy(project)
+        else:
+            self._original = None
+
     def load(self):
-        import tomli
+        data = super().load()
+        self._remember(data)
+        return data
+
+    def dumps(self, data):
+        text = self._patch(data)
+        if text is None:
+            return super().dumps(data)
 
-        return tomli.loads(self.read())
+        return text
 
     def save(self, data):
-        import tomli_w
+        super().save(data)
+        self._remember(data)
+
+    def _patch(self, data: Dict[str, Any]) -> Optional[str]:
+        from .spans import ScanError, scan_table
+
+        project = data.get("project")
+        original = self._original
+        if not isinstance(project, dict) or original is None or project.keys() != original.keys():
+            return None
+
+        edits: Dict[tuple, Tuple[Any, Any]] = {}
+        for key, value in project.items():
+            original_value = original[key]
+            if value == original_value:
+                continue
+            elif key not in self.PATCHABLE_KEYS:
+                return None
+
+            if key == "optional-dependencies" and isinstance(value, dict) and isinstance(original_value, dict):
+                if list(value) != list(original_value):
+                    return None
+
+                for group, dependencies in value.items():
+                    if dependencies != original_value[group]:
+                        edits["project", key, group] = (dependencies, original_value[group])
+            else:
+                edits["project", key] = (value, original_value)
+
+        text = self.read()
+        if not edits:
+            return text
+
+        try:
+            spans = scan_table(text, "project")
+        except ScanError:
+            return None
+
+        replacements = []
+        for path, (value, original_value) in edits.items():
+            if path not in spans:
+                return None
+
+            start, end = spans[path]
+
+            # Guard against the source being mapped incorrectly
+            try:
+                if self.backend.loads(f"x = {text[start:end]}")["x"] != original_value:
+                    return None
+            except self.backend.error:
+                return None
+
+            replacements.append((start, end, render_value(value, self.backend)))
+
+        chunks = []
+        position = len(text)
+        for start, end, replacement in sorted(replacements, reverse=True):
+            chunks.append(text[end:position])
+            chunks.append(replacement)
+            position = start
+
+        chunks.append(text[:position])
+        return "".join(reversed(chunks))
+
+
+def decode_text(content: Union[bytes, mmap]) -> str:
+    text = str(content, "utf-8")
+
+    # Match the universal newlines mode of reading files as text
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+
+    return text
+
+
+def _read_text(path: str) -> str:
+    with open(path, "rb") as f:
+        return decode_text(f.read())
+
+
+def render_value(value: Any, backend: Optional[TOMLBackend] = None) -> str:
+    if backend is None:
+        backend = get_toml_backend()
 
-        self.write(tomli_w.dumps(data))
+    # Serialize as a key/value pair so that the formatting matches that of full serialization
+    return backend.dumps({"x": value})[4:-1]
 
 
-def get_handler(path: Optional[str] = None):
-    # comment-preserving version one day
-    return StandardHandler(path)
+def get_handler(
+    path: Optional[str] = None,
+    content: Optional[bytes] = None,
+    documents: Optional[DocumentCache] = None,
+    backend: Optional[TOMLBackend] = None,
+) -> Handler:
+    """
+    Returns the handler for a file, which preserves comments and formatting when saving fixes.
+    The TOML `backend` defaults to the fastest one available.
+    """
+    return FormatPreservingHandler(path, content, documents, backend)
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import sys
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Type, Union
+
+if TYPE_CHECKING:
+    from .diagnostics import Diagnostic
+    from .engine import FileResult, ValidatorReport
+
+
+def visible_reports(reports: List[ValidatorReport], fix: bool) -> List[ValidatorReport]:
+    # Diagnostics that fixes were applied for are not worth mentioning
+    return [report for report in reports if (report.errors or report.warnings) and not fix or not report.fixable]
+
+
+class Reporter(ABC):
+    """
+    Writes the results of each file as soon as they are available rather than once every file
+    has been validated.
+    """
+
+    # Whether the source positions of diagnostics are reported
+    locate = False
+
+    def __init__(self, fix: bool = False, multiple: bool = False):
+        self.fix = fix
+        self.multiple = multiple
+
+    @abstractmethod
+    def report(self, result: FileResult):
+        """
+        Writes the results of a single file.
+        """
+
+    def finish(self, exit_code: int):  # noqa: B027
+        """
+        Called once every file has been reported, which reporters need not implement.
+        """
+
+
+class TextReporter(Reporter):
+    def report(self, result: FileResult):
+        if result.error is not None:
+            lines = [result.error]
+        else:
+            lines = []
+            for report in visible_reports(result.reports, self.fix):
+                lines.append(f"<<< {report.name} >>>")
+                lines.extend(f"error: {error}" for error in report.errors)
+                lines.extend(f"warning: {warning}" for warning in report.warnings)
+
+        if lines and self.multiple:
+            print(f"==> {result.path} <==")
+
+        for line in lines:
+            print(line)
+
+
+class NDJSONReporter(Reporter):
+    """
+    Writes a JSON object per line for every diagnostic followed by a summary, flushing after
+    each file so that consumers may process the results incrementally.
+    """
+
+    locate = True
+
+    def __init__(self, fix: bool = False, multiple: bool = False):
+        super().__init__(fix, multiple)
+
+        import json
+
+        self.encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+        self.files = 0
+        self.errors = 0
+        self.warnings = 0
+
+    def write(self, record: Dict[str, Any]):
+        sys.stdout.write(f"{self.encoder.encode(record)}\n")
+
+    def diagnostic(
+        self,
+        path: Optional[str],
+        validator: Optional[str],
+        severity: str,
+        message: Union[str, Diagnostic],
+        fixable: bool,
+    ):
+        record = {
+            "type": "diagnostic",
+            "file": path,
+            "validator": validator,
+            "severity": severity,
+            "message": str(message),
+            "fixable": fixable,
+            "path": None,
+            "line": None,
+            "column": None,
+        }
+        if not isinstance(message, str):
+            record["path"] = message.key
+            record["line"] = message.line
+            record["column"] = message.column
+
+        self.write(record)
+
+    def report(self, result: FileResult):
+        self.files += 1
+        if result.error is not None:
+            self.errors += 1
+            self.diagnostic(result.path, None, "error", result.error, False)
+        else:
+            for report in visible_reports(result.reports, self.fix):
+                self.errors += len(report.errors)
+                self.warnings += len(report.warnings)
+                for error in report.errors:
+                    self.diagnostic(result.path, report.name, "error", error, report.fixable)
+                for warning in report.warnings:
+                    self.diagnostic(result.path, report.name, "warning", warning, report.fixable)
+
+        sys.stdout.flush()
+
+    def finish(self, exit_code: int):
+        self.write(
+            {
+                "type": "summary",
+                "files": self.files,
+                "errors": self.errors,
+                "warnings": self.warnings,
+                "exit_code": exit_code,
+            }
+        )
+        sys.stdout.flush()
+
+
+REPORTERS: Dict[str, Type[Reporter]] = {"text": TextReporter, "ndjson": NDJSONReporter}
+
+
+def get_reporter(name: str, fix: bool = False, multiple: bool = False) -> Reporter:
+    return REPORTERS[name](fix, multiple)
@@ -0,0 +1,299 @@
+from __future__ import annotations
+
+import os
+import re
+from collections import OrderedDict
+from typing import Dict, List, Optional, Set, Tuple
+
+from .utils import normalize_project_name
+
+# The same requirement strings show up in many files so unique strings are only parsed again by the
+# same process once evicted, mapping the raw string to either the normalized form or the parsing error.
+# Worker processes each have their own so a string may be parsed by every one of them.
+_memo: OrderedDict[str, Tuple[Optional[str], Optional[str]]] = OrderedDict()
+# Entries computed by `packaging` since the last call to `drain`, the others are normalized faster
+# than they could be loaded
+_new: Dict[str, Tuple[Optional[str], Optional[str]]] = {}
+_seeded: Set[str] = set()
+
+# Loading must remain cheaper than parsing, even for runs that only parse a few of them
+MAX_PERSISTED_ENTRIES = 2_000
+# Processes like the daemon may see an unbounded number of unique strings
+MAX_MEMO_ENTRIES = 100_000
+
+# The common forms of PEP 508 requirements are normalized without `packaging`, which is slow to both
+# import and use. These patterns only accept a strict subset of what `packaging` accepts so that the
+# result is always identical, anything else falls back to it.
+_REQUIREMENT = re.compile(
+    r"""
+    [ \t]*(?P<name>[A-Za-z0-9](?:[A-Za-z0-9._-]*[A-Za-z0-9])?)
+    [ \t]*(?:\[(?P<extras>[^\]]*)\])?
+    [ \t]*(?:
+        # URLs may contain semicolons so markers must be preceded by a space
+        @[ \t]*(?P<url>https?://[^\s/?#\[\]@]+(?:[/?#]\S*)?)(?:[ ]+;[ \t]*(?P<url_marker>.+?))?
+        |
+        (?P<specifiers>[^;@]*?)(?:[ \t]*;[ \t]*(?P<marker>.+?))?
+    )
+    [ \t]*
+    """,
+    re.VERBOSE,
+)
+_EXTRA = re.compile(r"[ \t]*([A-Za-z0-9](?:[A-Za-z0-9._-]*[A-Za-z0-9])?)[ \t]*")
+_RELEASE = r"[0-9]+(?:\.[0-9]+)*"
+_SUFFIXES = r"(?:(?:a|b|rc)[0-9]+)?(?:\.post[0-9]+)?(?:\.dev[0-9]+)?"
+_SPECIFIER = re.compile(
+    rf"""
+    [ \t]*(?:
+        (?P<exact>==|!=)[ \t]*(?P<exact_version>{_RELEASE}(?:\.\*|{_SUFFIXES}))
+        |
+        (?P<compatible>~=)[ \t]*(?P<compatible_version>[0-9]+(?:\.[0-9]+)+{_SUFFIXES})
+        |
+        (?P<ordered><=|>=|<|>)[ \t]*(?P<ordered_version>{_RELEASE}{_SUFFIXES})
+    )[ \t]*
+    """,
+    re.VERBOSE | re.IGNORECASE,
+)
+_MARKER_VARIABLES = (
+    "implementation_version|platform_python_implementation|implementation_name|python_full_version|"
+    "platform_release|platform_version|platform_machine|platform_system|python_version|sys_platform|"
+    "os_name|extra"
+)
+_MARKER_OPERAND = (
+    rf"""(?:(?P<{{0}}_variable>(?:{_MARKER_VARIABLES})\b)|'(?P<{{0}}_single>[^']*)'|"(?P<{{0}}_double>[^"]*)")"""
+)
+_MARKER_ITEM = re.compile(
+    rf"""
+    [ \t]*{_MARKER_OPERAND.format("left")}
+    [ \t]*(?P<operator>===|==|>=|<=|!=|~=|>|<|\bnot[ ]in\b|\bin\b)
+    [ \t]*{_MARKER_OPERAND.format("right")}
+    [ \t]*(?:(?P<combinator>\band\b|\bor\b)|\Z)
+    """,
+    re.VERBOSE,
+)
+
+
+def normalize_requirement(dependency: str) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Returns a tuple of the normalized requirement and `None`, or `None` and the parsing error.
+    """
+    result = _memo.get(dependency)
+    if result is not None:
+        try:
+            _memo.move_to_end(dependency)
+        except KeyError:
+            # Evicted by another thread in the meantime
+            pass
+
+        return result
+
+    normalized = _fast_normalize_requirement(dependency)
+    if normalized is not None:
+        result = (normalized, None)
+    else:
+        result = _new[dependency] = _parse_requirement(dependency)
+
+    _memo[dependency] = result
+    if len(_memo) > MAX_MEMO_ENTRIES:
+        try:
+            _memo.popitem(last=False)
+        except KeyError:
+            # Evicted by another thread in the meantime
+            pass
+
+    return result
+
+
+def _format_marker_operand(match: re.Match, side: str) -> str:
+    variable = match.group(f"{side}_variable")
+    if variable is not None:
+        return variable
+
+    value = match.group(f"{side}_single")
+    if value is None:
+        value = match.group(f"{side}_double")
+
+    return f'"{value}"'
+
+
+def _format_marker(marker: str) -> Optional[str]:
+    parts = []
+    position = 0
+    length = len(marker)
+    while position < length:
+        match = _MARKER_ITEM.match(marker, position)
+        if match is None:
+            return None
+
+        parts.extend(
+            (_format_marker_operand(match, "left"), match.group("operator"), _format_marker_operand(match, "right"))
+        )
+        position = match.end()
+
+        combinator = match.group("combinator")
+        if combinator is None:
+            break
+
+        parts.append(combinator)
+    else:
+        # Dangling combinator
+        return None
+
+    return " ".join(parts)
+
+
+def _fast_normalize_requirement(dependency: str) -> Optional[str]:
+    """
+    Returns the same normalization as `packaging` for the common forms of requirements or
+    `None` if the requirement is not one of them.
+    """
+    match = _REQUIREMENT.fullmatch(dependency)
+    if match is None:
+        return None
+
+    parts = [normalize_project_name(match.group("name"))]
+
+    extras = match.group("extras")
+    if extras is not None and extras.strip(" \t"):
+        names = set()
+        for extra in extras.split(","):
+            extra_match = _EXTRA.fullmatch(extra)
+            if extra_match is None:
+                return None
+
+            names.add(extra_match.group(1))
+
+        parts.append(f"[{','.join(sorted(names))}]")
+
+    url = match.group("url")
+    if url is not None:
+        parts.append(f"@ {url}")
+        marker = match.group("url_marker")
+        if marker is not None:
+            parts.append(" ")
+    else:
+        specifiers = match.group("specifiers")
+        if specifiers:
+            formatted = []
+            operators = set()
+            for specifier in specifiers.split(","):
+                specifier_match = _SPECIFIER.fullmatch(specifier)
+                if specifier_match is None:
+                    return None
+
+                operator, version = (group for group in specifier_match.groups() if group is not None)
+
+                # Equivalent specifiers are deduplicated based on normalized versions
+                if operator in operators:
+                    return None
+
+                operators.add(operator)
+                formatted.append(f"{operator}{version}")
+
+            parts.append(",".join(sorted(formatted)))
+
+        marker = match.group("marker")
+
+    if marker is not None:
+        formatted_marker = _format_marker(marker)
+        if formatted_marker is None:
+            return None
+
+        parts.append(f"; {formatted_marker}")
+
+    # All TOML writers use double quotes, so avoid escaping
+    return "".join(parts).lower().replace('"', "'")
+
+
+def _parse_requirement(dependency: str) -> Tuple[Optional[str], Optional[str]]:
+    # Slow import
+    from packaging.requirements import InvalidRequirement, Requirement
+
+    try:
+        requirement = Requirement(dependency)
+    except InvalidRequirement as e:
+        return None, str(e)
+
+    requirement.name = normalize_project_name(requirement.name)
+
+    # All TOML writers use double quotes, so avoid escaping
+    return str(requirement).lower().replace('"', "'"), None
+
+
+def drain() -> Dict[str, Tuple[Optional[str], Optional[str]]]:
+    global _new
+
+    new, _new = _new, {}
+    return new
+
+
+def _packaging_version() -> str:
+    # Normalization may change between versions of `packaging`, unlike its top-level import it is cheap
+    import packaging
+
+    return packaging.__version__
+
+
+def read(path: str) -> Dict[str, List[Optional[str]]]:
+    import json
+
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            persisted = json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+    if not isinstance(persisted, dict) or persisted.get("packaging") != _packaging_version():
+        return {}
+
+    return persisted.get("entries", {})
+
+
+def seed(path: str, entries: Optional[Dict[str, List[Optional[str]]]] = None):
+    """
+    Loads previously persisted normalizations once per process. The `entries` may be given if
+    they were already read from `path`, e.g. by the parent of worker processes.
+    """
+    if path in _seeded:
+        return
+
+    _seeded.add(path)
+    if entries is None:
+        entries = read(path)
+
+    # The most recently persisted entries come last
+    for dependency, (normalized, error) in list(entries.items())[-MAX_MEMO_ENTRIES:]:
+        _memo.setdefault(dependency, (normalized, error))
+
+    while len(_memo) > MAX_MEMO_ENTRIES:
+        _memo.popitem(last=False)
+
+
+def persist(path: str, entries: Dict[str, Tuple[Optional[str], Optional[str]]]):
+    """
+    Merges the `entries` into those already stored at `path`, discarding the oldest entries once
+    there are more than `MAX_PERSISTED_ENTRIES`.
+    """
+    if not entries:
+        return
+
+    import json
+
+    persisted = read(path)
+    for dependency, result in entries.items():
+        persisted.pop(dependency, None)
+        persisted[dependency] = list(result)
+
+    excess = len(persisted) - MAX_PERSISTED_ENTRIES
+    if excess > 0:
+        for dependency in list(persisted)[:excess]:
+            del persisted[dependency]
+
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump({"packaging": _packaging_version(), "entries": persisted}, f, separators=(",", ":"))
+
+        os.replace(temp_path, path)
+    except OSError:  # no cov
+        pass
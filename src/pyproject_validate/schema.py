@@ -0,0 +1,155 @@
+"""
+Plain type checks mirroring the models in `models.py`, used to avoid instantiating (and importing)
+the models for the vast majority of files which are valid.
+
+These checks are intentionally stricter than the models e.g. no coercion of numbers to strings,
+so a `False` result only means that the models must be consulted for the definitive answer and
+error messages. A `True` result must never be returned for data that the models would reject.
+"""
+from __future__ import annotations
+
+from typing import Any
+
+KNOWN_README_CONTENT_TYPES = ("text/markdown", "text/x-rst", "text/plain")
+KNOWN_README_EXTENSIONS = (".md", ".rst", ".txt")
+
+# Mapping of keys to the field names of `ProjectConfig`, which is what the `dynamic` checks compare against
+PROJECT_FIELDS = {
+    "authors": "authors",
+    "classifiers": "classifiers",
+    "dependencies": "dependencies",
+    "description": "description",
+    "entry-points": "entry_points",
+    "gui-scripts": "gui_scripts",
+    "keywords": "keywords",
+    "license": "license",
+    "license-files": "license_files",
+    "maintainers": "maintainers",
+    "name": "name",
+    "optional-dependencies": "optional_dependencies",
+    "readme": "readme",
+    "scripts": "scripts",
+    "urls": "urls",
+    "version": "version",
+}
+
+
+def _is_str_list(value: Any) -> bool:
+    return isinstance(value, list) and all(isinstance(item, str) for item in value)
+
+
+def _is_str_mapping(value: Any) -> bool:
+    return isinstance(value, dict) and all(isinstance(item, str) for item in value.values())
+
+
+def _is_optional_str(table: dict, key: str) -> bool:
+    return key not in table or isinstance(table[key], str)
+
+
+def _is_author_list(value: Any) -> bool:
+    if not isinstance(value, list):
+        return False
+
+    for author in value:
+        if not (isinstance(author, dict) and _is_optional_str(author, "email") and _is_optional_str(author, "name")):
+            return False
+
+    return True
+
+
+def _is_license(value: Any) -> bool:
+    if isinstance(value, str):
+        return True
+    elif not isinstance(value, dict):
+        return False
+
+    if "file" in value and "text" in value:
+        return False
+
+    return _is_optional_str(value, "file") and _is_optional_str(value, "text")
+
+
+def _is_license_files(value: Any) -> bool:
+    if not isinstance(value, dict) or not ("globs" in value or "paths" in value):
+        return False
+
+    return all(key not in value or _is_str_list(value[key]) for key in ("globs", "paths"))
+
+
+def _is_readme(value: Any) -> bool:
+    if isinstance(value, str):
+        return value.lower().endswith(KNOWN_README_EXTENSIONS)
+    elif not isinstance(value, dict):
+        return False
+
+    if "file" in value and "text" in value:
+        return False
+
+    content_type = value.get("content-type")
+    if not isinstance(content_type, str) or content_type not in KNOWN_README_CONTENT_TYPES:
+        return False
+
+    return all(_is_optional_str(value, key) for key in ("charset", "file", "text"))
+
+
+def _is_entry_points(value: Any) -> bool:
+    return isinstance(value, dict) and all(_is_str_mapping(group) for group in value.values())
+
+
+def _is_optional_dependencies(value: Any) -> bool:
+    return isinstance(value, dict) and all(_is_str_list(group) for group in value.values())
+
+
+_PROJECT_CHECKS = {
+    "authors": _is_author_list,
+    "classifiers": _is_str_list,
+    "dependencies": _is_str_list,
+    "description": lambda value: isinstance(value, str),
+    "dynamic": _is_str_list,
+    "entry-points": _is_entry_points,
+    "gui-scripts": _is_str_mapping,
+    "keywords": _is_str_list,
+    "license": _is_license,
+    "license-files": _is_license_files,
+    "maintainers": _is_author_list,
+    "name": lambda value: isinstance(value, str),
+    "optional-dependencies": _is_optional_dependencies,
+    "readme": _is_readme,
+    "scripts": _is_str_mapping,
+    "urls": _is_str_mapping,
+    "version": lambda value: isinstance(value, str),
+}
+
+
+def build_system_is_valid(data: Any) -> bool:
+    """
+    https://www.python.org/dev/peps/pep-0517/#source-trees
+    """
+    if not isinstance(data, dict):
+        return False
+
+    if not _is_str_list(data.get("requires")) or not isinstance(data.get("build-backend"), str):
+        return False
+
+    return "backend-path" not in data or _is_str_list(data["backend-path"])
+
+
+def project_is_valid(data: Any) -> bool:
+    """
+    https://www.python.org/dev/peps/pep-0621/#details
+    """
+    if not isinstance(data, dict) or "name" not in data:
+        return False
+
+    for key, check in _PROJECT_CHECKS.items():
+        if key in data and not check(data[key]):
+            return False
+
+    dynamic = data.get("dynamic", ())
+    if "name" in dynamic:
+        return False
+
+    if "version" not in data and "version" not in dynamic:
+        return False
+
+    return not any(PROJECT_FIELDS[key] in dynamic for key in PROJECT_FIELDS if key in data)
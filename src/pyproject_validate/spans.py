@@ -0,0 +1,235 @@
+"""
+A minimal TOML scanner that records where every value is located in the source rather than
+deserializing it. Key paths are tuples of keys and, for arrays and arrays of tables, indices.
+"""
+from __future__ import annotations
+
+import re
+from typing import Callable, Dict, Optional, Tuple, Union
+
+KeyPath = Tuple[Union[str, int], ...]
+Span = Tuple[int, int]
+
+WHITESPACE = re.compile(r"[ \t]*")
+WHITESPACE_COMMENTS_NEWLINES = re.compile(r"(?:[ \t\r\n]+|#[^\n]*)*")
+LINE_END = re.compile(r"[ \t]*(?:#[^\n]*)?(?:\r?\n|\Z)")
+BARE_KEY = re.compile(r"[A-Za-z0-9_-]+")
+BASIC_STRING = re.compile(r'"(?:[^"\\\r\n]|\\.)*"')
+LITERAL_STRING = re.compile(r"'[^'\r\n]*'")
+MULTILINE_BASIC_STRING = re.compile(r'"""(?:[^\\"]|\\[\s\S]|"(?!""))*""""{0,2}')
+MULTILINE_LITERAL_STRING = re.compile(r"'''[\s\S]*?''''{0,2}")
+# Date-times may separate the date and time with a space
+SCALAR = re.compile(r"[^\s,\]}#]+(?: \d{2}:[^\s,\]}#]*)?")
+
+
+class ScanError(ValueError):
+    pass
+
+
+class Scanner:
+    def __init__(self, text: str):
+        self.text = text
+        self.pos = 0
+        self.spans: Dict[KeyPath, Span] = {}
+        # Headers of tables and arrays of tables, which are not values
+        self.tables: Dict[KeyPath, Span] = {}
+        # Current index of every array of tables
+        self.table_arrays: Dict[KeyPath, int] = {}
+
+    def error(self, message: str):
+        line = self.text.count("\n", 0, self.pos) + 1
+        raise ScanError(f"{message} (line {line})")
+
+    def match(self, pattern: re.Pattern) -> str:
+        match = pattern.match(self.text, self.pos)
+        if match is None:
+            self.error("unexpected character")
+
+        self.pos = match.end()
+        return match.group()
+
+    def expect(self, literal: str):
+        if not self.text.startswith(literal, self.pos):
+            self.error(f"expected `{literal}`")
+
+        self.pos += len(literal)
+
+    def scan(self, stop: Optional[Callable[[KeyPath], bool]] = None) -> Dict[KeyPath, Span]:
+        """
+        Scans from the current position to the end, or to the first header of a table for which
+        `stop` returns true in which case the position is left at the start of the header.
+        """
+        table: KeyPath = ()
+        text_length = len(self.text)
+        while True:
+            self.match(WHITESPACE_COMMENTS_NEWLINES)
+            if self.pos >= text_length:
+                break
+
+            start = self.pos
+            if self.text.startswith("[[", self.pos):
+                self.pos += 2
+                key = self.key()
+                self.expect("]]")
+
+                path = self.resolve(key[:-1]) + key[-1:]
+                if stop is not None and stop(path):
+                    self.pos = start
+                    break
+
+                index = self.table_arrays[path] = self.table_arrays.get(path, -1) + 1
+                table = path + (index,)
+                self.tables[table] = (start, self.pos)
+            elif self.text.startswith("[", self.pos):
+                self.pos += 1
+                table = self.resolve(self.key())
+                self.expect("]")
+                if stop is not None and stop(table):
+                    self.pos = start
+                    break
+
+                self.tables[table] = (start, self.pos)
+            else:
+                self.key_value(table)
+
+            self.match(LINE_END)
+
+        return self.spans
+
+    def resolve(self, key: KeyPath) -> KeyPath:
+        # Headers of tables nested within arrays of tables refer to the most recent entry
+        path: KeyPath = ()
+        for part in key:
+            path += (part,)
+            if path in self.table_arrays:
+                path += (self.table_arrays[path],)
+
+        return path
+
+    def key(self) -> KeyPath:
+        parts = []
+        while True:
+            self.match(WHITESPACE)
+            char = self.text[self.pos : self.pos + 1]
+            if char == '"':
+                raw = self.match(BASIC_STRING)
+                parts.append(decode_basic_string(raw))
+            elif char == "'":
+                parts.append(self.match(LITERAL_STRING)[1:-1])
+            else:
+                parts.append(self.match(BARE_KEY))
+
+            self.match(WHITESPACE)
+            if not self.text.startswith(".", self.pos):
+                return tuple(parts)
+
+            self.pos += 1
+
+    def key_value(self, table: KeyPath):
+        key = self.key()
+        self.expect("=")
+        self.match(WHITESPACE)
+        self.value(table + key)
+
+    def value(self, path: KeyPath):
+        start = self.pos
+        char = self.text[start : start + 1]
+        if char == '"':
+            if self.text.startswith('"""', start):
+                self.match(MULTILINE_BASIC_STRING)
+            else:
+                self.match(BASIC_STRING)
+        elif char == "'":
+            if self.text.startswith("'''", start):
+                self.match(MULTILINE_LITERAL_STRING)
+            else:
+                self.match(LITERAL_STRING)
+        elif char == "[":
+            self.array(path)
+        elif char == "{":
+            self.inline_table(path)
+        else:
+            self.match(SCALAR)
+
+        self.spans[path] = (start, self.pos)
+
+    def array(self, path: KeyPath):
+        self.pos += 1
+        index = 0
+        while True:
+            self.match(WHITESPACE_COMMENTS_NEWLINES)
+            if self.text.startswith("]", self.pos):
+                break
+
+            self.value(path + (index,))
+            index += 1
+
+            self.match(WHITESPACE_COMMENTS_NEWLINES)
+            if self.text.startswith(",", self.pos):
+                self.pos += 1
+            elif not self.text.startswith("]", self.pos):
+                self.error("expected `,` or `]`")
+
+        self.pos += 1
+
+    def inline_table(self, path: KeyPath):
+        self.pos += 1
+        self.match(WHITESPACE)
+        if self.text.startswith("}", self.pos):
+            self.pos += 1
+            return
+
+        while True:
+            self.key_value(path)
+            self.match(WHITESPACE)
+            if self.text.startswith(",", self.pos):
+                self.pos += 1
+            elif self.text.startswith("}", self.pos):
+                self.pos += 1
+                return
+            else:
+                self.error("expected `,` or `}`")
+
+
+def decode_basic_string(raw: str) -> str:
+    if "\\" not in raw:
+        return raw[1:-1]
+
+    # Rare enough to not warrant reimplementing escape sequences
+    from .handlers import get_toml_backend
+
+    return get_toml_backend().loads(f"x = {raw}")["x"]
+
+
+def scan(text: str) -> Dict[KeyPath, Span]:
+    """
+    Returns the location of every value in the TOML `text` as a mapping of key paths to
+    the offsets of the start and end of the value.
+    """
+    return Scanner(text).scan()
+
+
+def scan_table(text: str, key: str) -> Dict[KeyPath, Span]:
+    """
+    Like `scan` but only scans the parts of the TOML `text` that may define values of the top-level
+    table `key`, which are those before the first header and those following its own headers.
+    Values of other tables that are defined within these parts are also returned.
+    """
+    scanner = Scanner(text)
+
+    def elsewhere(table: KeyPath) -> bool:
+        return table[:1] != (key,)
+
+    scanner.scan(elsewhere)
+
+    quoted = re.escape(key)
+    header = re.compile(rf"""^[ \t]*\[\[?[ \t]*(?:{quoted}|"{quoted}"|'{quoted}')[ \t]*[.\]]""", re.MULTILINE)
+    while True:
+        match = header.search(text, scanner.pos)
+        if match is None:
+            break
+
+        scanner.pos = match.start()
+        scanner.scan(elsewhere)
+
+    return scanner.spans
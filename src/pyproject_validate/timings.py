@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# name, category, start (ns), duration (ns), process ID, thread ID, path
+Span = Tuple[str, str, int, int, int, int, Optional[str]]
+
+
+class Timer:
+    """
+    Records the duration of each phase. The spans are plain tuples so that they may be cheaply
+    sent back from worker processes.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.spans: List[Span] = []
+
+    @contextmanager
+    def span(self, name: str, category: str) -> Iterator[None]:
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter_ns() - start
+            self.spans.append((name, category, start, duration, os.getpid(), threading.get_ident(), self.path))
+
+
+class NullTimer:
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.spans: List[Span] = []
+
+    @contextmanager
+    def span(self, name: str, category: str) -> Iterator[None]:
+        yield
+
+
+def summarize(spans: List[Span]) -> List[str]:
+    totals: Dict[str, List[int]] = {}
+    for name, _, _, duration, *_ in spans:
+        totals.setdefault(name, []).append(duration)
+
+    rows = sorted(totals.items(), key=lambda item: sum(item[1]), reverse=True)
+    width = max([len("phase"), *(len(name) for name, _ in rows)])
+
+    lines = [f"{'phase':<{width}} {'count':>8} {'total (ms)':>12} {'mean (ms)':>12} {'max (ms)':>12}"]
+    for name, durations in rows:
+        total = sum(durations) / 1e6
+        lines.append(
+            f"{name:<{width}} {len(durations):>8} {total:>12.3f} {total / len(durations):>12.3f} "
+            f"{max(durations) / 1e6:>12.3f}"
+        )
+
+    return lines
+
+
+def write_trace(path: str, spans: List[Span]):
+    """
+    Writes the spans in the trace event format understood by `chrome://tracing` and Perfetto.
+    """
+    import json
+
+    events: List[Dict[str, Any]] = []
+    for name, category, start, duration, pid, tid, file_path in spans:
+        event: Dict[str, Any] = {
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": start / 1000,
+            "dur": duration / 1000,
+            "pid": pid,
+            "tid": tid,
+        }
+        if file_path is not None:
+            event["args"] = {"path": file_path}
+
+        events.append(event)
+
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from ..diagnostics import Diagnostic
+
+
+class ValidationResult:
+    """
+    The outcome of validating a single file, including the plan for fixing it, so that
+    validators themselves hold no state and may be shared across files and threads.
+    """
+
+    __slots__ = ("errors", "warnings", "fixable", "exit_early", "fixes")
+
+    def __init__(self):
+        self.errors: List[Diagnostic] = []
+        self.warnings: List[Diagnostic] = []
+        # Whether every error may be automatically fixed
+        self.fixable = True
+        # Whether any errors may interfere with the validators that depend on this one
+        self.exit_early = False
+        # Key paths mapped to their fixed values
+        self.fixes: Dict[Tuple[str, ...], Any] = {}
+
+    def fix(self, data: Dict[str, Any]):
+        for path, value in self.fixes.items():
+            target = data
+            for key in path[:-1]:
+                target = target.setdefault(key, {})
+
+            target[path[-1]] = value
+
+
+class Validator(ABC):
+    @abstractmethod
+    def validate(self, data: Dict[str, Any]) -> ValidationResult:
+        """
+        Validates the provided raw deserialized pyproject.toml `data`, which must not be
+        modified. Any fixes are recorded in the result rather than applied.
+        """
+
+
+class ValidatorEntry(NamedTuple):
+    # Import path of the validator class relative to this package, as `module:Class`
+    path: str
+    # Dotted paths of the keys that are read, the validator is skipped if none are present.
+    # No sections means the entire document is always validated.
+    sections: Tuple[str, ...]
+    # Relative cost so that cheap validators run first
+    cost: int
+    # Validators that must run first and not fail with `exit_early` set
+    depends: Tuple[str, ...] = ()
+
+    def load(self) -> Validator:
+        from importlib import import_module
+
+        module_name, class_name = self.path.split(":")
+        return getattr(import_module(module_name, __name__), class_name)()
+
+    def applies(self, data: Dict[str, Any]) -> bool:
+        if not self.sections:
+            return True
+
+        for section in self.sections:
+            value: Any = data
+            for key in section.split("."):
+                if not isinstance(value, dict) or key not in value:
+                    break
+
+                value = value[key]
+            else:
+                return True
+
+        return False
+
+
+REGISTRY: Dict[str, ValidatorEntry] = {
+    "specs": ValidatorEntry(".specs:SpecValidator", (), cost=2),
+    "naming": ValidatorEntry(".naming:NameValidator", ("project.name",), cost=1, depends=("specs",)),
+    "dependencies": ValidatorEntry(
+        ".dependencies:DependencyValidator",
+        ("project.dependencies", "project.optional-dependencies"),
+        cost=10,
+        depends=("specs",),
+    ),
+}
+
+
+def schedule(select: Optional[Iterable[str]] = None, ignore: Optional[Iterable[str]] = None) -> List[str]:
+    """
+    Returns the names of the enabled validators in the order they should run, which is the
+    cheapest first among those whose dependencies have already run. Unknown names raise a
+    `ValueError`.
+    """
+    unknown = sorted({*(select or ()), *(ignore or ())} - REGISTRY.keys())
+    if unknown:
+        raise ValueError(f"unknown validators: {', '.join(unknown)}")
+
+    enabled = set(REGISTRY if select is None else select) - set(ignore or ())
+
+    # Dependencies that are disabled impose no ordering
+    remaining = {name: {dep for dep in REGISTRY[name].depends if dep in enabled} for name in enabled}
+    order = []
+    while remaining:
+        ready = [name for name, depends in remaining.items() if not depends]
+        if not ready:  # no cov
+            raise ValueError(f"circular validator dependencies: {', '.join(sorted(remaining))}")
+
+        name = min(ready, key=lambda name: (REGISTRY[name].cost, name))
+        order.append(name)
+        del remaining[name]
+        for depends in remaining.values():
+            depends.discard(name)
+
+    return order
+
+
+_instances: Dict[str, Validator] = {}
+
+
+def get_validators(names: Optional[Iterable[str]] = None) -> Dict[str, Validator]:
+    """
+    Returns the shared instances of the named validators, or every validator in scheduled order.
+    Only the modules of the requested validators are imported.
+    """
+    validators = {}
+    for name in schedule() if names is None else names:
+        validator = _instances.get(name)
+        if validator is None:
+            validator = _instances[name] = REGISTRY[name].load()
+
+        validators[name] = validator
+
+    return validators
+
+
+def __getattr__(name: str) -> Any:
+    # Validators used to be defined in this module
+    for entry in REGISTRY.values():
+        if entry.path.endswith(f":{name}"):
+            from importlib import import_module
+
+            return getattr(import_module(entry.path.split(":")[0], __name__), name)
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
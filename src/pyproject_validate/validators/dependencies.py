@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+from ..diagnostics import Diagnostic
+from ..requirements import normalize_requirement
+from . import ValidationResult, Validator
+
+
+class DependencyValidator(Validator):
+    def validate(self, data):
+        result = ValidationResult()
+        project_data = data["project"]
+
+        dependencies = self._validate_dependency_list(
+            project_data.get("dependencies", []), result, ("project", "dependencies")
+        )
+        if dependencies:
+            result.fixes[("project", "dependencies")] = dependencies
+
+        optional_dependencies = {}
+        groups = project_data.get("optional-dependencies", {})
+        if not isinstance(groups, dict):
+            result.fixable = False
+            result.errors.append(
+                Diagnostic(("project", "optional-dependencies"), "optional dependencies must be a table")
+            )
+            groups = {}
+
+        for name, group in groups.items():
+            optional_dependencies[name] = self._validate_dependency_list(
+                group,
+                result,
+                ("project", "optional-dependencies", name),
+                message_prefix=f"optional `{name}` dependencies",
+            )
+
+        if optional_dependencies:
+            result.fixes[("project", "optional-dependencies")] = optional_dependencies
+
+        return result
+
+    @staticmethod
+    def _validate_dependency_list(dependencies, result, path, message_prefix="dependencies"):
+        # Specs are not validated first if disabled
+        if not isinstance(dependencies, list):
+            result.fixable = False
+            result.errors.append(Diagnostic(path, "{} must be an array", message_prefix))
+            return []
+
+        temp_errors = []
+
+        normalized_dependencies = []
+        for i, dependency in enumerate(dependencies, 1):
+            if not isinstance(dependency, str):
+                temp_errors.append(Diagnostic(path + (i - 1,), "{} #{}: must be a string", message_prefix, i))
+                result.fixable = False
+                continue
+
+            normalized_dependency, error = normalize_requirement(dependency)
+            if error is not None:
+                temp_errors.append(Diagnostic(path + (i - 1,), "{} #{}: {}", message_prefix, i, error))
+                result.fixable = False
+            else:
+                if dependency != normalized_dependency:
+                    temp_errors.append(
+                        Diagnostic(path + (i - 1,), "{} #{} should be: {}", message_prefix, i, normalized_dependency)
+                    )
+
+                normalized_dependencies.append(normalized_dependency)
+
+        result.errors.extend(temp_errors)
+        normalized_dependencies.sort()
+
+        # No need to check sorting if there were errors
+        if temp_errors:
+            return normalized_dependencies
+        elif dependencies != normalized_dependencies:
+            result.errors.append(Diagnostic(path, "{} are not sorted", message_prefix))
+
+        return normalized_dependencies
@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+import re
+
+from ..diagnostics import Diagnostic
+from ..utils import normalize_project_name
+from . import ValidationResult, Validator
+
+
+class NameValidator(Validator):
+    def validate(self, data):
+        result = ValidationResult()
+        name = data["project"]["name"]
+
+        # Specs are not validated first if disabled
+        if not isinstance(name, str):
+            result.fixable = False
+            result.errors.append(Diagnostic(("project", "name"), "must be a string"))
+            return result
+
+        # https://www.python.org/dev/peps/pep-0508/#names
+        if not re.search("^([A-Z0-9]|[A-Z0-9][A-Z0-9._-]*[A-Z0-9])$", name, re.IGNORECASE):
+            result.fixable = False
+            result.errors.append(
+                Diagnostic(
+                    ("project", "name"), "must only contain ASCII letters/digits, underscores, hyphens, and periods"
+                )
+            )
+            return result
+
+        normalized_name = normalize_project_name(name)
+
+        if name != normalized_name:
+            result.errors.append(Diagnostic(("project", "name"), "should be {}", normalized_name))
+            result.fixes[("project", "name")] = normalized_name
+
+        return result
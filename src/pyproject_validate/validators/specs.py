@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+from ..diagnostics import Diagnostic
+from ..schema import build_system_is_valid, project_is_valid
+from . import ValidationResult, Validator
+
+
+def model_error(section: str, e: Exception) -> Diagnostic:
+    # Point to the first invalid field and only render the full explanation if asked
+    path = (section,)
+    errors = getattr(e, "errors", None)
+    if errors is not None:
+        path += tuple(key for key in errors()[0]["loc"] if key != "__root__")
+
+    return Diagnostic(path, "{}", e)
+
+
+class SpecValidator(Validator):
+    def validate(self, data):
+        result = ValidationResult()
+        build_system = data.get("build-system", {})
+        project = data.get("project", {})
+
+        # Only consult the models for their error messages when the fast checks fail
+        if not build_system_is_valid(build_system):
+            # Slow import
+            from ..models import BuildSystemConfig
+
+            try:
+                BuildSystemConfig(**build_system)
+            except Exception as e:
+                result.fixable = False
+                result.exit_early = True
+                result.errors.append(model_error("build-system", e))
+
+        if not project_is_valid(project):
+            # Slow import
+            from ..models import ProjectConfig
+
+            try:
+                ProjectConfig(**project)
+            except Exception as e:
+                result.fixable = False
+                result.exit_early = True
+                result.errors.append(model_error("project", e))
+
+        return result
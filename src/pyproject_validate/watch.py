@@ -0,0 +1,169 @@
+"""
+Notification of changes to files, using inotify on Linux and polling elsewhere.
+"""
+from __future__ import annotations
+
+import os
+import sys
+import time
+from typing import Dict, List, Optional, Set, Tuple, Union
+
+# Editors often write a file several times in quick succession when saving
+DEBOUNCE_INTERVAL = 0.05
+POLLING_INTERVAL = 0.25
+
+
+class PollingWatcher:
+    def __init__(self, paths: List[str], interval: float = POLLING_INTERVAL):
+        self.interval = interval
+        self._states = {path: self._state(path) for path in paths}
+
+    @staticmethod
+    def _state(path: str) -> Optional[Tuple[int, int, int]]:
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+
+        return st.st_mtime_ns, st.st_size, st.st_ino
+
+    def _poll(self) -> Set[str]:
+        changed = set()
+        for path, state in self._states.items():
+            new_state = self._state(path)
+            if new_state != state:
+                self._states[path] = new_state
+                if new_state is not None:
+                    changed.add(path)
+
+        return changed
+
+    def wait(self, timeout: Optional[float] = None) -> Set[str]:
+        """
+        Returns the paths of the files that were modified or replaced, or an empty set if none
+        were within `timeout` seconds.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            changed = self._poll()
+            if changed:
+                return changed
+
+            if deadline is None:
+                time.sleep(self.interval)
+            else:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return changed
+
+                time.sleep(min(self.interval, remaining))
+
+    def close(self):
+        pass
+
+
+class InotifyWatcher:
+    """
+    Watches the directories containing the files, rather than the files themselves, since
+    editors commonly save by replacing files.
+    """
+
+    # IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+    MASK = 0x00000002 | 0x00000008 | 0x00000080 | 0x00000100
+    EVENT_HEADER_SIZE = 16
+
+    def __init__(self, paths: List[str]):
+        import ctypes
+        import ctypes.util
+
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._fd = self._libc.inotify_init1(os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "unable to initialize inotify")
+
+        self._directories: Dict[int, str] = {}
+        self._names: Dict[str, Set[str]] = {}
+        try:
+            for path in paths:
+                directory, name = os.path.split(os.path.abspath(path))
+                if directory not in self._names:
+                    descriptor = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), self.MASK)
+                    if descriptor < 0:
+                        raise OSError(ctypes.get_errno(), f"unable to watch {directory}")
+
+                    self._directories[descriptor] = directory
+                    self._names[directory] = set()
+
+                self._names[directory].add(name)
+        except BaseException:
+            self.close()
+            raise
+
+        # Report the paths as they were given
+        self._paths = {os.path.abspath(path): path for path in paths}
+
+    def wait(self, timeout: Optional[float] = None) -> Set[str]:
+        import select
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            readable, _, _ = select.select([self._fd], [], [], remaining)
+            if not readable:
+                return set()
+
+            # Other files in the same directories may have changed
+            changed = self._read_events()
+            if changed:
+                return changed
+
+    def _read_events(self) -> Set[str]:
+        import struct
+
+        buffer = os.read(self._fd, 64 * 1024)
+        changed = set()
+        offset = 0
+        while offset < len(buffer):
+            descriptor, _, _, length = struct.unpack_from("iIII", buffer, offset)
+            offset += self.EVENT_HEADER_SIZE
+            name = os.fsdecode(buffer[offset : offset + length].rstrip(b"\0"))
+            offset += length
+
+            directory = self._directories.get(descriptor)
+            if directory is not None and name in self._names[directory]:
+                changed.add(self._paths[os.path.join(directory, name)])
+
+        return changed
+
+    def close(self):
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+Watcher = Union[InotifyWatcher, PollingWatcher]
+
+
+def get_watcher(paths: List[str]) -> Watcher:
+    if sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(paths)
+        except (AttributeError, OSError):
+            # The C library lacks inotify or the limit of watches was reached
+            pass
+
+    return PollingWatcher(paths)
+
+
+def wait_for_changes(watcher: Watcher, debounce: float = DEBOUNCE_INTERVAL) -> List[str]:
+    """
+    Blocks until any file changes and then until no more changes happen for `debounce` seconds,
+    returning every path that changed in sorted order.
+    """
+    changed = watcher.wait()
+    while True:
+        more = watcher.wait(debounce)
+        if not more:
+            return sorted(changed)
+
+        changed |= more
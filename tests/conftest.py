@@ -40,6 +40,19 @@ def invoke(capsys):
     return lambda *args: _invoke(args, capsys)
 
 
+@pytest.fixture(autouse=True)
+def isolated_cache(tmp_path, monkeypatch):
+    cache_dir = tmp_path / "cache"
+    monkeypatch.setenv("PYPROJECT_VALIDATE_CACHE_DIR", str(cache_dir))
+    return cache_dir
+
+
+@pytest.fixture(autouse=True)
+def isolated_daemon(tmp_path, monkeypatch):
+    # Never forward to a daemon the developer may be running
+    monkeypatch.setenv("PYPROJECT_VALIDATE_SOCKET", str(tmp_path / "daemon.sock"))
+
+
 @pytest.fixture
 def project_file():
     with TemporaryDirectory() as d:
@@ -0,0 +1,30 @@
+"""
+Documents and helpers shared by the tests of several modules.
+"""
+
+VALID = """\
+[build-system]
+requires = ["hatchling"]
+build-backend = "hatchling.build"
+
+[project]
+name = "foo"
+version = "0.0.1"
+"""
+INVALID = VALID.replace('"foo"', '"Foo.bAr"')
+
+
+def create_projects(root, *contents):
+    """
+    Writes each of the `contents` to the `pyproject.toml` file of its own project directory within
+    `root`, returning the paths in the same order.
+    """
+    paths = []
+    for i, text in enumerate(contents):
+        directory = root / f"project{i}"
+        directory.mkdir()
+        path = directory / "pyproject.toml"
+        path.write_text(text, encoding="utf-8")
+        paths.append(path)
+
+    return paths
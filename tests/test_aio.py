@@ -0,0 +1,105 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from pyproject_validate import AsyncValidator, api
+
+from .helpers import VALID
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+class ConcurrencyTracker:
+    def __init__(self, monkeypatch, delay=0.01):
+        self.lock = threading.Lock()
+        self.current = 0
+        self.maximum = 0
+        self.calls = 0
+        self.delay = delay
+
+        original = api.validate_text
+
+        def validate_text(*args):
+            with self.lock:
+                self.calls += 1
+                self.current += 1
+                self.maximum = max(self.maximum, self.current)
+
+            try:
+                time.sleep(self.delay)
+                return original(*args)
+            finally:
+                with self.lock:
+                    self.current -= 1
+
+        monkeypatch.setattr(api, "validate_text", validate_text)
+
+
+def test_validate():
+    async def main():
+        async with AsyncValidator() as validator:
+            valid, invalid, fixed = await asyncio.gather(
+                validator.validate_text(VALID),
+                validator.validate_data({"project": {"name": "Foo"}}, validators=["naming"]),
+                validator.fix_text(VALID.replace('"foo"', '"Foo"')),
+            )
+
+        assert valid.valid
+        assert invalid.errors == ["should be foo"]
+        assert fixed.text == VALID
+
+    run(main())
+
+
+def test_path(project_file):
+    project_file.write(VALID.replace('"foo"', '"Foo"'))
+
+    async def main():
+        async with AsyncValidator() as validator:
+            return await validator.validate_path(str(project_file.path), fix=True)
+
+    assert run(main()).fixed
+    assert project_file.read() == VALID
+
+
+def test_bounded_concurrency(monkeypatch):
+    tracker = ConcurrencyTracker(monkeypatch)
+
+    async def main():
+        async with AsyncValidator(max_concurrency=3) as validator:
+            return await asyncio.gather(*(validator.validate_text(VALID) for _ in range(20)))
+
+    results = run(main())
+
+    assert all(result.valid for result in results)
+    assert tracker.calls == 20
+    assert tracker.maximum == 3
+
+
+def test_cancellation(monkeypatch):
+    tracker = ConcurrencyTracker(monkeypatch, delay=0.1)
+
+    async def main():
+        async with AsyncValidator(max_concurrency=1) as validator:
+            tasks = [asyncio.ensure_future(validator.validate_text(VALID)) for _ in range(5)]
+            await asyncio.sleep(0.05)
+            for task in tasks:
+                task.cancel()
+
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+            # The slot is only released once the validation that had started finishes
+            return await validator.validate_text(VALID)
+
+    assert run(main()).valid
+    assert tracker.calls == 2
+    assert tracker.maximum == 1
+
+
+def test_invalid_concurrency():
+    with pytest.raises(ValueError):
+        AsyncValidator(max_concurrency=0)
@@ -0,0 +1,127 @@
+import pytest
+
+import pyproject_validate
+from pyproject_validate import Result, fix_text, validate_data, validate_path, validate_text
+
+VALID = """\
+[build-system]
+requires = ["hatchling"]
+build-backend = "hatchling.build"
+
+[project]
+name = "foo"
+version = "0.0.1"
+dependencies = ["bar", "foo"]
+"""
+
+FIXABLE = """\
+[build-system]
+requires = ["hatchling"]
+build-backend = "hatchling.build"
+
+[project]
+name = "Foo"  # comment
+version = "0.0.1"
+dependencies = ["foo", "Bar"]
+"""
+
+
+def test_valid():
+    result = validate_text(VALID)
+
+    assert result.valid
+    assert not result.errors
+    assert list(result.validators) == ["specs", "naming", "dependencies"]
+
+
+def test_invalid():
+    result = validate_text(FIXABLE)
+
+    assert not result.valid
+    assert result.errors == ["should be foo", "dependencies #2 should be: bar"]
+    assert result.validators["naming"].fixable
+    assert result.text is None
+
+
+def test_slots():
+    result = validate_text(VALID)
+
+    with pytest.raises(AttributeError):
+        result.foo = 1
+
+    with pytest.raises(AttributeError):
+        result.validators["naming"].foo = 1
+
+
+def test_syntax_error():
+    result = validate_text("[project")
+
+    assert not result.valid
+    assert result.error is not None
+    assert result.errors == [result.error]
+
+
+def test_data_not_modified():
+    data = {
+        "build-system": {"requires": ["hatchling"], "build-backend": "hatchling.build"},
+        "project": {"name": "Foo", "version": "0.0.1"},
+    }
+
+    result = validate_data(data, validators=["naming"])
+
+    assert result.errors == ["should be foo"]
+    assert data["project"]["name"] == "Foo"
+
+
+def test_unknown_validator():
+    with pytest.raises(ValueError, match="unknown validators: foo"):
+        validate_data({}, validators=["foo"])
+
+
+def test_fix():
+    result = fix_text(FIXABLE)
+
+    assert result.valid
+    assert result.fixed
+    assert result.text == FIXABLE.replace('"Foo"', '"foo"').replace(
+        'dependencies = ["foo", "Bar"]', 'dependencies = [\n    "bar",\n    "foo",\n]'
+    )
+
+
+def test_fix_unfixable():
+    text = FIXABLE.replace('"Bar"', '"Bar baz"')
+
+    result = fix_text(text)
+
+    assert not result.valid
+    assert not result.fixed
+    assert result.text == text
+
+
+def test_path(project_file):
+    project_file.write(FIXABLE)
+
+    result = validate_path(str(project_file.directory))
+
+    assert not result.valid
+    assert project_file.read() == FIXABLE
+
+    result = validate_path(str(project_file.path), fix=True)
+
+    assert result.valid
+    assert result.fixed
+    assert validate_path(str(project_file.path)).valid
+
+
+def test_missing_path(tmp_path):
+    result = validate_path(str(tmp_path))
+
+    assert not result.valid
+    assert result.error is not None
+
+
+def test_lazy_exports():
+    assert isinstance(validate_text(VALID), Result)
+
+    with pytest.raises(AttributeError):
+        pyproject_validate.foo
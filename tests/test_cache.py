@@ -0,0 +1,245 @@
+import importlib.util
+import os
+
+import pytest
+
+from pyproject_validate import cache as cache_module
+from pyproject_validate.cache import DocumentCache, ResultCache
+from pyproject_validate.handlers import get_handler, get_toml_backend
+
+from .helpers import INVALID
+
+
+def cache_entries(cache_dir):
+    results_dir = cache_dir / "results"
+    return sorted(results_dir.iterdir()) if results_dir.is_dir() else []
+
+
+def test_stored(project_file, invoke, isolated_cache):
+    project_file.write(INVALID)
+
+    result = invoke()
+
+    assert result.code == 1, result.output
+    assert len(cache_entries(isolated_cache)) == 1
+
+
+def test_replayed(project_file, invoke, isolated_cache):
+    project_file.write(INVALID)
+    expected = invoke()
+
+    # Make the file unparsable while retaining the cache entry
+    (entry,) = cache_entries(isolated_cache)
+    entry.write_text(entry.read_text(encoding="utf-8").replace("should be", "cached"), encoding="utf-8")
+
+    result = invoke()
+
+    assert result.code == expected.code
+    assert (
+        result.output
+        == """\
+<<< naming >>>
+error: cached foo-bar
+"""
+    )
+
+
+def test_changed_file(project_file, invoke, isolated_cache):
+    project_file.write(INVALID)
+    invoke()
+
+    project_file.write(INVALID.replace("Foo.bAr", "foo"))
+    result = invoke()
+
+    assert result.code == 0, result.output
+    assert not result.output
+    assert len(cache_entries(isolated_cache)) == 2
+
+
+def test_library_upgrade(tmp_path, monkeypatch):
+    module = tmp_path / "pydantic.py"
+    module.write_text("VERSION = '1.0'\n", encoding="utf-8")
+    original_find_spec = importlib.util.find_spec
+
+    def find_spec(name, *args, **kwargs):
+        if name == "pydantic":
+            return importlib.util.spec_from_file_location(name, str(module))
+
+        return original_find_spec(name, *args, **kwargs)
+
+    monkeypatch.setattr(importlib.util, "find_spec", find_spec)
+    monkeypatch.setattr(cache_module, "_library_identity", None)
+    cache = ResultCache(str(tmp_path / "cache"))
+    key = cache.key(b"", ["specs"])
+
+    module.write_text("VERSION = '1.10'\n", encoding="utf-8")
+    monkeypatch.setattr(cache_module, "_library_identity", None)
+
+    assert cache.key(b"", ["specs"]) != key
+
+
+def test_fix_bypasses_cache(project_file, invoke, isolated_cache):
+    project_file.write(INVALID)
+    invoke()
+
+    result = invoke("--fix")
+
+    assert result.code == 0, result.output
+    assert 'name = "foo-bar"' in project_file.read()
+
+
+def test_disabled(project_file, invoke, isolated_cache):
+    project_file.write(INVALID)
+
+    result = invoke("--no-cache")
+
+    assert result.code == 1, result.output
+    assert not cache_entries(isolated_cache)
+
+
+def test_prune(tmp_path):
+    cache = ResultCache(str(tmp_path), max_size=100)
+    for i in range(10):
+        cache.set(f"{i:064x}", [["naming", ["x" * 10], [], True, False]])
+        path = tmp_path / "results" / f"{i:064x}.json"
+        os.utime(path, ns=(i * 10**9, i * 10**9))
+
+    cache.prune()
+
+    stats = cache.stats()
+    assert stats["size"] <= 80
+    # The most recently used entries survive
+    assert cache.get(f"{9:064x}") is not None
+    assert cache.get(f"{0:064x}") is None
+
+
+def test_stats_and_clear(project_file, invoke, isolated_cache):
+    project_file.write(INVALID)
+    invoke()
+
+    result = invoke("cache", "stats")
+
+    assert result.code == 0, result.output
+    assert f"Location: {isolated_cache}\n" in result.output
+    assert "Entries: 1\n" in result.output
+
+    result = invoke("cache", "clear")
+
+    assert result.code == 0, result.output
+    assert not isolated_cache.exists()
+
+
+class TestDocuments:
+    @pytest.fixture
+    def parses(self, monkeypatch):
+        backend = type(get_toml_backend())
+        calls = []
+        loads = backend.loads
+
+        def counting_loads(*args, **kwargs):
+            calls.append(None)
+            return loads(*args, **kwargs)
+
+        monkeypatch.setattr(backend, "loads", counting_loads)
+        return calls
+
+    @staticmethod
+    def age(path, seconds=10):
+        mtime_ns = os.stat(path).st_mtime_ns - seconds * 10**9
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+    def test_hit(self, project_file, isolated_cache, parses):
+        project_file.write(INVALID)
+        self.age(project_file.path)
+        documents = DocumentCache(str(isolated_cache))
+
+        data = get_handler(str(project_file.path), documents=documents).load()
+        handler = get_handler(str(project_file.path), documents=documents)
+
+        assert handler.load() == data
+        assert len(parses) == 1
+        # Nothing was read
+        assert handler._content is None
+
+    def test_changed_file(self, project_file, isolated_cache, parses):
+        project_file.write(INVALID)
+        self.age(project_file.path)
+        documents = DocumentCache(str(isolated_cache))
+        get_handler(str(project_file.path), documents=documents).load()
+
+        project_file.write(INVALID.replace("Foo.bAr", "foo"))
+        self.age(project_file.path, 5)
+
+        assert get_handler(str(project_file.path), documents=documents).load()["project"]["name"] == "foo"
+        assert len(parses) == 2
+
+    def test_recently_modified(self, project_file, isolated_cache, parses):
+        project_file.write(INVALID)
+        documents = DocumentCache(str(isolated_cache))
+
+        for _ in range(2):
+            get_handler(str(project_file.path), documents=documents).load()
+
+        assert len(parses) == 2
+
+    def test_unmarshallable(self, project_file, isolated_cache, parses):
+        project_file.write(f"{INVALID}date = 1979-05-27\n")
+        self.age(project_file.path)
+        documents = DocumentCache(str(isolated_cache))
+
+        for _ in range(2):
+            get_handler(str(project_file.path), documents=documents).load()
+
+        assert len(parses) == 2
+
+    def test_corrupted(self, tmp_path):
+        documents = DocumentCache(str(tmp_path))
+        (tmp_path / "documents").mkdir()
+        (tmp_path / "documents" / f"{0:064x}.marshal").write_bytes(b"\xff")
+
+        assert documents.get(f"{0:064x}") is None
+
+    def test_prune(self, tmp_path):
+        source = tmp_path / "pyproject.toml"
+        source.write_text("", encoding="utf-8")
+        self.age(source)
+        stat = os.stat(source)
+
+        documents = DocumentCache(str(tmp_path), max_size=100)
+        for i in range(10):
+            assert documents.set(f"{i:064x}", {"x": "x" * 10}, stat)
+            path = tmp_path / "documents" / f"{i:064x}.marshal"
+            os.utime(path, ns=(i * 10**9, i * 10**9))
+
+        documents.prune()
+
+        # The most recently used entries survive
+        assert documents.get(f"{9:064x}") is not None
+        assert documents.get(f"{0:064x}") is None
+
+    def test_cli(self, project_file, invoke, isolated_cache, parses):
+        project_file.write(INVALID)
+        self.age(project_file.path)
+
+        for _ in range(2):
+            result = invoke("--no-cache", "--document-cache")
+
+            assert result.code == 1, result.output
+            assert "should be foo-bar" in result.output
+
+        assert len(parses) == 1
+        assert len(list((isolated_cache / "documents").iterdir())) == 1
+
+
+def test_clear_shared_directory(project_file, invoke, isolated_cache):
+    project_file.write(INVALID)
+    invoke("--document-cache")
+    other = isolated_cache / "other-tool"
+    other.mkdir()
+    (other / "data").write_text("", encoding="utf-8")
+
+    result = invoke("cache", "clear")
+
+    assert result.code == 0, result.output
+    assert sorted(path.name for path in isolated_cache.iterdir()) == ["other-tool"]
+    assert (other / "data").is_file()
@@ -0,0 +1,114 @@
+import shutil
+import subprocess
+
+import pytest
+
+from pyproject_validate.discovery import find_changed_projects
+
+from .helpers import VALID
+
+pytestmark = pytest.mark.skipif(shutil.which("git") is None, reason="Git is not installed")
+
+INVALID = VALID.replace('"foo"', '"Foo"')
+
+
+def git(*args):
+    subprocess.run(
+        ["git", "-c", "user.name=foo", "-c", "user.email=foo@bar.baz", *args],
+        check=True,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+
+@pytest.fixture
+def repo(tmp_path, monkeypatch):
+    root = tmp_path / "repo"
+    for relative_path in ("pyproject.toml", "a/pyproject.toml", "b/pyproject.toml", "c/pyproject.toml"):
+        path = root / relative_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(VALID, encoding="utf-8")
+
+    monkeypatch.chdir(root)
+    git("init", "-q")
+    git("add", ".")
+    git("commit", "-q", "-m", "initial")
+    git("tag", "base")
+    return root
+
+
+def test_working_tree(repo):
+    (repo / "a" / "pyproject.toml").write_text(INVALID, encoding="utf-8")
+    (repo / "b" / "pyproject.toml").write_text(INVALID, encoding="utf-8")
+    git("add", "b")
+    (repo / "c" / "pyproject.toml").unlink()
+    (repo / "d").mkdir()
+    (repo / "d" / "pyproject.toml").write_text(VALID, encoding="utf-8")
+    (repo / "README.md").write_text("", encoding="utf-8")
+
+    assert find_changed_projects() == [
+        str(repo / "a" / "pyproject.toml"),
+        str(repo / "b" / "pyproject.toml"),
+        str(repo / "d" / "pyproject.toml"),
+    ]
+
+
+def test_staged(repo):
+    (repo / "a" / "pyproject.toml").write_text(INVALID, encoding="utf-8")
+    (repo / "b" / "pyproject.toml").write_text(INVALID, encoding="utf-8")
+    git("add", "b")
+
+    assert find_changed_projects(staged=True) == [str(repo / "b" / "pyproject.toml")]
+
+
+def test_since_revision(repo):
+    (repo / "a" / "pyproject.toml").write_text(INVALID, encoding="utf-8")
+    git("commit", "-q", "-am", "modify")
+
+    assert not find_changed_projects()
+    assert find_changed_projects("base") == [str(repo / "a" / "pyproject.toml")]
+
+
+def test_limited_paths(repo, monkeypatch):
+    (repo / "a" / "pyproject.toml").write_text(INVALID, encoding="utf-8")
+    (repo / "b" / "pyproject.toml").write_text(INVALID, encoding="utf-8")
+    monkeypatch.chdir(repo / "b")
+
+    assert find_changed_projects(paths=["."]) == [str(repo / "b" / "pyproject.toml")]
+
+
+def test_cli(repo, invoke):
+    (repo / "a" / "pyproject.toml").write_text(INVALID, encoding="utf-8")
+    (repo / "b" / "pyproject.toml").write_text(INVALID, encoding="utf-8")
+    git("add", "b")
+
+    result = invoke("--staged")
+
+    assert result.code == 1, result.output
+    assert result.output == "<<< naming >>>\nerror: should be foo\n"
+
+    result = invoke("--changed-since", "base")
+
+    assert result.code == 1, result.output
+    assert result.output.count("error: should be foo") == 2
+
+
+def test_cli_nothing_changed(repo, invoke):
+    result = invoke("--changed-since", "base")
+
+    assert result.code == 0, result.output
+    assert result.output == "no `pyproject.toml` files have changed\n"
+
+
+def test_cli_unknown_revision(repo, invoke):
+    result = invoke("--changed-since", "unknown")
+
+    assert result.code == 1
+    assert "unknown" in result.output
+
+
+def test_cli_recursive(repo, invoke):
+    result = invoke("--staged", "--recursive")
+
+    assert result.code == 2
+    assert "not allowed with argument" in result.output
@@ -0,0 +1,157 @@
+import os
+import subprocess
+import sys
+import time
+from tempfile import TemporaryDirectory
+
+import pytest
+
+from pyproject_validate import daemon as daemon_module
+
+from .helpers import INVALID, VALID
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="requires Unix sockets")
+
+
+@pytest.fixture
+def daemon(monkeypatch, isolated_cache):
+    # Socket paths have a small maximum length so avoid the deeply nested temporary directories of pytest
+    with TemporaryDirectory() as d:
+        path = os.path.join(d, "daemon.sock")
+        monkeypatch.setenv("PYPROJECT_VALIDATE_SOCKET", path)
+
+        process = subprocess.Popen([sys.executable, "-m", "pyproject_validate", "daemon"])
+        try:
+            for _ in range(200):
+                if daemon_module.is_running(path):
+                    break
+
+                time.sleep(0.05)
+            else:  # no cov
+                raise RuntimeError("daemon did not start")
+
+            yield path
+        finally:
+            if process.poll() is None:
+                process.terminate()
+
+            process.wait(10)
+
+
+def fail_in_process(monkeypatch):
+    from pyproject_validate import engine
+
+    def run(*args, **kwargs):  # no cov
+        raise AssertionError("validation ran in-process")
+
+    monkeypatch.setattr(engine, "run", run)
+
+
+def test_forwarded(daemon, project_file, invoke, monkeypatch):
+    project_file.write(INVALID)
+    fail_in_process(monkeypatch)
+
+    result = invoke()
+
+    assert result.code == 1, result.output
+    assert (
+        result.output
+        == """\
+<<< naming >>>
+error: should be foo-bar
+"""
+    )
+
+    result = invoke("--fix")
+
+    assert result.code == 0, result.output
+    assert 'name = "foo-bar"' in project_file.read()
+
+
+def test_status_and_stop(daemon, invoke):
+    result = invoke("daemon", "status")
+
+    assert result.code == 0, result.output
+    assert result.output == f"running on {daemon}\n"
+
+    result = invoke("daemon", "stop")
+
+    assert result.code == 0, result.output
+
+    result = invoke("daemon", "status")
+
+    assert result.code == 1, result.output
+    assert result.output == f"not running on {daemon}\n"
+
+
+def test_fallback_stale_socket(project_file, invoke, tmp_path, monkeypatch):
+    path = tmp_path / "stale.sock"
+    path.touch()
+    monkeypatch.setenv("PYPROJECT_VALIDATE_SOCKET", str(path))
+    project_file.write(VALID)
+
+    result = invoke()
+
+    assert result.code == 0, result.output
+    assert not result.output
+
+
+def test_forwarded_environment(daemon, project_file, invoke, monkeypatch, tmp_path):
+    project_file.write(VALID)
+    fail_in_process(monkeypatch)
+    # Changed after the daemon started
+    cache_dir = tmp_path / "other-cache"
+    monkeypatch.setenv("PYPROJECT_VALIDATE_CACHE_DIR", str(cache_dir))
+
+    result = invoke()
+
+    assert result.code == 0, result.output
+    assert os.listdir(cache_dir / "results")
+
+
+def test_untrusted_socket(daemon, monkeypatch):
+    uid = os.getuid()
+    monkeypatch.setattr(os, "getuid", lambda: uid + 1)
+
+    assert daemon_module.forward([]) is None
+    assert not daemon_module.is_running(daemon)
+    assert not daemon_module.stop(daemon)
+
+
+def test_default_socket_private_directory(tmp_path, monkeypatch):
+    monkeypatch.delenv("PYPROJECT_VALIDATE_SOCKET")
+    monkeypatch.delenv("XDG_RUNTIME_DIR", raising=False)
+    monkeypatch.setenv("TMPDIR", str(tmp_path))
+
+    path = daemon_module.get_socket_path()
+    directory = os.path.dirname(path)
+
+    assert directory == str(tmp_path / f"pyproject-validate-{os.getuid()}")
+
+    daemon_module._make_private_directory(directory)
+    assert os.stat(directory).st_mode & 0o777 == 0o700
+
+    os.chmod(directory, 0o755)
+    with pytest.raises(OSError, match="not a directory that only the current user may access"):
+        daemon_module._make_private_directory(directory)
+
+
+@pytest.mark.parametrize(
+    "request_line",
+    [b"[]\n", b"{}\n", b'{"argv": "--fix", "cwd": "."}\n', b'{"argv": [], "cwd": ".", "env": {"A": 1}}\n', b"{\n"],
+)
+def test_malformed_request(daemon, request_line):
+    with daemon_module._connect(daemon) as client:
+        client.sendall(request_line)
+        # The connection is closed without a response
+        assert client.recv(1) == b""
+
+    assert daemon_module.is_running(daemon)
+
+
+def test_other_installation(daemon, monkeypatch):
+    monkeypatch.setattr(sys, "prefix", "/other/environment")
+
+    # Run in-process instead
+    assert daemon_module.forward([]) is None
+    assert daemon_module.is_running(daemon)
@@ -0,0 +1,149 @@
+import pickle
+
+from pyproject_validate import validate_text
+from pyproject_validate.diagnostics import Diagnostic, SourceMap, format_key_path
+
+DOCUMENT = """\
+[build-system]
+requires = ["hatchling"]
+build-backend = "hatchling.build"
+
+[project]
+name = "Foo"
+version = "0.0.1"
+dependencies = [
+  "foo",
+  "Bar",
+]
+
+[project.optional-dependencies]
+dev = ["foo", "bar"]
+
+[[tool.foo]]
+x = 1
+
+[[tool.foo]]
+y = 2
+
+[tool.bar.baz]
+z = 3
+"""
+
+
+class Message:
+    def __init__(self):
+        self.calls = 0
+
+    def __str__(self):
+        self.calls += 1
+        return "message"
+
+
+def test_format_key_path():
+    assert format_key_path(("project", "optional-dependencies", "foo", 2)) == "project.optional-dependencies.foo[2]"
+    assert format_key_path(("tool", "foo.bar", 'a"b')) == 'tool."foo.bar"."a\\"b"'
+    assert format_key_path(()) == ""
+
+
+class TestSourceMap:
+    def test_values(self):
+        source = SourceMap(DOCUMENT)
+
+        assert source.locate(("project", "name")) == (6, 8)
+        assert source.locate(("project", "dependencies")) == (8, 16)
+        assert source.locate(("project", "dependencies", 1)) == (10, 3)
+        assert source.locate(("project", "optional-dependencies", "dev")) == (14, 7)
+        assert source.locate(("tool", "foo", 1, "y")) == (20, 5)
+
+    def test_tables(self):
+        source = SourceMap(DOCUMENT)
+
+        assert source.locate(("project",)) == (5, 1)
+        assert source.locate(("project", "optional-dependencies")) == (13, 1)
+        assert source.locate(("tool", "foo", 1)) == (19, 1)
+
+    def test_missing(self):
+        source = SourceMap(DOCUMENT)
+
+        # The closest enclosing value
+        assert source.locate(("project", "readme")) == (5, 1)
+        # The first value of a table that is never declared
+        assert source.locate(("tool",)) == (16, 1)
+        assert source.locate(("tool", "bar")) == (22, 1)
+        assert source.locate(("foo",)) is None
+
+    def test_lazy_text(self):
+        calls = []
+
+        def read():
+            calls.append(None)
+            return DOCUMENT
+
+        source = SourceMap(read)
+        assert not calls
+
+        source.locate(("project", "name"))
+        source.locate(("project", "version"))
+        assert len(calls) == 1
+
+    def test_unsupported_syntax(self):
+        source = SourceMap('[project]\nname = "foo"\nversion = 1979-05-27\n')
+
+        assert source.locate(("project", "name")) == (2, 8)
+
+
+class TestDiagnostic:
+    def test_lazy_message(self):
+        message = Message()
+        diagnostic = Diagnostic(("project", "name"), "{}!", message)
+        assert message.calls == 0
+
+        assert str(diagnostic) == "message!"
+        assert diagnostic.message == "message!"
+        assert message.calls == 1
+
+    def test_position(self):
+        diagnostic = Diagnostic(("project", "name"), "should be foo")
+        assert diagnostic.line is None
+
+        diagnostic = Diagnostic(("project", "name"), "should be foo")
+        diagnostic.source = SourceMap(DOCUMENT)
+        assert (diagnostic.line, diagnostic.column) == (6, 8)
+        assert diagnostic.key == "project.name"
+
+    def test_pickle(self):
+        diagnostic = Diagnostic(("project", "name"), "{}", Message())
+        diagnostic.source = SourceMap(DOCUMENT)
+
+        restored = pickle.loads(pickle.dumps(diagnostic))
+
+        assert restored == diagnostic
+        assert restored.source is None
+        assert restored.position == (6, 8)
+
+    def test_dump(self):
+        diagnostic = Diagnostic(("project", "dependencies", 1), "{} #{}", "dependencies", 2)
+
+        assert Diagnostic.load(diagnostic.dump()) == diagnostic
+
+
+def test_validators():
+    result = validate_text(DOCUMENT)
+
+    (name,) = result.validators["naming"].errors
+    assert (name.line, name.column) == (6, 8)
+
+    dependency, unsorted = result.validators["dependencies"].errors
+    assert dependency.key == "project.dependencies[1]"
+    assert (dependency.line, dependency.column) == (10, 3)
+    assert unsorted.key == "project.optional-dependencies.dev"
+    assert unsorted.message == "optional `dev` dependencies are not sorted"
+
+
+def test_model_errors():
+    result = validate_text(DOCUMENT.replace('version = "0.0.1"', 'version = "0.0.1"\nreadme = "README"'))
+
+    (error,) = result.validators["specs"].errors
+    assert error.key == "project.readme"
+    assert error.line == 8
+    assert str(error).startswith("1 validation error for ProjectConfig")
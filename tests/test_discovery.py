@@ -0,0 +1,161 @@
+import os
+
+import pytest
+
+from pyproject_validate import discovery
+from pyproject_validate.discovery import Discoverer, IgnoreRule
+
+from .helpers import VALID
+
+
+def create_tree(root, files):
+    for relative_path, text in files.items():
+        path = root.joinpath(*relative_path.split("/"))
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text, encoding="utf-8")
+
+
+def age_tree(root):
+    # Listings of recently modified directories are never trusted
+    timestamp = 1_000_000_000
+    for directory, _, files in os.walk(root):
+        for name in files:
+            os.utime(os.path.join(directory, name), (timestamp, timestamp))
+
+        os.utime(directory, (timestamp, timestamp))
+
+
+@pytest.fixture
+def tree(tmp_path):
+    root = tmp_path / "root"
+    create_tree(
+        root,
+        {
+            "pyproject.toml": VALID,
+            ".gitignore": "build/\n/dist\n*.egg-info\nignored-*\n!ignored-but-included\n",
+            "a/pyproject.toml": VALID,
+            "a/b/pyproject.toml": VALID,
+            "a/.gitignore": "generated\n",
+            "a/generated/pyproject.toml": VALID,
+            "c/dist/pyproject.toml": VALID,
+            "dist/pyproject.toml": VALID,
+            "build/pyproject.toml": VALID,
+            "foo.egg-info/pyproject.toml": VALID,
+            "ignored-1/pyproject.toml": VALID,
+            "ignored-but-included/pyproject.toml": VALID,
+            ".git/pyproject.toml": VALID,
+            "node_modules/foo/pyproject.toml": VALID,
+            "env/pyvenv.cfg": "",
+            "env/lib/pyproject.toml": VALID,
+        },
+    )
+    return root
+
+
+def relative_paths(root, paths):
+    return [os.path.relpath(path, root).replace(os.sep, "/") for path in paths]
+
+
+def test_pruning(tree):
+    projects = Discoverer().discover(str(tree))
+
+    assert relative_paths(tree, projects) == [
+        "pyproject.toml",
+        "a/pyproject.toml",
+        "a/b/pyproject.toml",
+        "c/dist/pyproject.toml",
+        "ignored-but-included/pyproject.toml",
+    ]
+
+
+def test_cached_listings(tree, tmp_path, monkeypatch):
+    cache_path = str(tmp_path / "discovery.json")
+    age_tree(tree)
+    discoverer = Discoverer(cache_path)
+    expected = discoverer.discover(str(tree))
+    discoverer.save()
+
+    scanned = []
+    original = discovery._scan_directory
+    monkeypatch.setattr(discovery, "_scan_directory", lambda path: scanned.append(path) or original(path))
+
+    discoverer = Discoverer(cache_path)
+    assert discoverer.discover(str(tree)) == expected
+    assert not scanned
+
+    (tree / "a" / "b" / "new").mkdir()
+    (tree / "a" / "b" / "new" / "pyproject.toml").write_text(VALID, encoding="utf-8")
+
+    projects = Discoverer(cache_path).discover(str(tree))
+
+    assert relative_paths(tree, projects) == [
+        "pyproject.toml",
+        "a/pyproject.toml",
+        "a/b/pyproject.toml",
+        "a/b/new/pyproject.toml",
+        "c/dist/pyproject.toml",
+        "ignored-but-included/pyproject.toml",
+    ]
+    assert relative_paths(tree, scanned) == ["a/b", "a/b/new"]
+
+
+def test_modified_ignore_file(tree, tmp_path):
+    cache_path = str(tmp_path / "discovery.json")
+    age_tree(tree)
+    discoverer = Discoverer(cache_path)
+    discoverer.discover(str(tree))
+    discoverer.save()
+
+    # Modifying a file in place does not change the modification time of its directory
+    with open(tree / "a" / ".gitignore", "a", encoding="utf-8") as f:
+        f.write("b\n")
+
+    projects = Discoverer(cache_path).discover(str(tree))
+
+    assert "a/b/pyproject.toml" not in relative_paths(tree, projects)
+
+
+@pytest.mark.parametrize(
+    "pattern, path, is_directory, expected",
+    [
+        ("foo", "a/foo", False, True),
+        ("foo/", "a/foo", False, False),
+        ("foo/", "a/foo", True, True),
+        ("/foo", "foo", True, True),
+        ("/foo", "a/foo", True, False),
+        ("a/*/c", "a/b/c", True, True),
+        ("a/*/c", "a/b/b/c", True, False),
+        ("a/**/c", "a/b/b/c", True, True),
+        ("**/c", "a/b/c", True, True),
+        ("*.py[co]", "a/foo.pyc", False, True),
+        ("*.py[!co]", "a/foo.pyc", False, False),
+        ("fo?", "foo", False, True),
+        ("\\#foo", "#foo", False, True),
+    ],
+)
+def test_ignore_rule(pattern, path, is_directory, expected):
+    assert IgnoreRule("", pattern).matches(path, path.rsplit("/", 1)[-1], is_directory) is expected
+
+
+def test_cli(tree, invoke, monkeypatch):
+    (tree / "a" / "b" / "pyproject.toml").write_text(VALID.replace('"foo"', '"Foo"'), encoding="utf-8")
+    monkeypatch.chdir(tree)
+
+    result = invoke("--recursive")
+
+    assert result.code == 1, result.output
+    assert (
+        result.output
+        == f"""\
+==> {tree / "a" / "b" / "pyproject.toml"} <==
+<<< naming >>>
+error: should be foo
+"""
+    )
+
+
+def test_cli_nothing_found(tmp_path, invoke):
+    result = invoke("--recursive", str(tmp_path))
+
+    assert result.code == 1, result.output
+    assert result.output == "could not locate any `pyproject.toml` files\n"
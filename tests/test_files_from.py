@@ -0,0 +1,109 @@
+import io
+import itertools
+import sys
+
+import pytest
+
+from pyproject_validate.cli import reads_stdin
+from pyproject_validate.discovery import read_paths
+from pyproject_validate.engine import STREAM_BATCH_SIZE, run
+
+from .helpers import INVALID, VALID, create_projects
+
+
+@pytest.fixture
+def stdin(monkeypatch):
+    def set_stdin(content):
+        monkeypatch.setattr(sys, "stdin", io.TextIOWrapper(io.BytesIO(content)))
+
+    return set_stdin
+
+
+class TestReadPaths:
+    @pytest.mark.parametrize("chunk_size", [1, 3, 1024])
+    def test_newlines(self, chunk_size):
+        stream = io.BytesIO(b"foo\nbar/baz\r\n\nqux")
+
+        assert list(read_paths(stream, chunk_size)) == ["foo", "bar/baz", "qux"]
+
+    @pytest.mark.parametrize("chunk_size", [1, 3, 1024])
+    def test_nul(self, chunk_size):
+        stream = io.BytesIO(b"foo\0with\nnewline\0\0bar\0")
+
+        assert list(read_paths(stream, chunk_size)) == ["foo", "with\nnewline", "bar"]
+
+    def test_empty(self):
+        assert not list(read_paths(io.BytesIO(b"")))
+
+    def test_lazy(self):
+        stream = io.BytesIO(b"foo\n" * 100_000)
+
+        paths = read_paths(stream, 1024)
+        next(paths)
+
+        assert stream.tell() == 1024
+
+
+def test_reads_stdin():
+    assert reads_stdin(["--files-from", "-"])
+    assert reads_stdin(["--fix", "--files-from=-"])
+    assert not reads_stdin(["--files-from", "paths.txt"])
+    assert not reads_stdin(["--files-from"])
+    assert not reads_stdin(["-"])
+
+
+@pytest.mark.parametrize("jobs", ["1", "2"])
+def test_stdin(project_file, invoke, stdin, jobs):
+    paths = create_projects(project_file.directory, VALID, INVALID, VALID, INVALID)
+    stdin("".join(f"{path.parent}\n" for path in paths).encode("utf-8"))
+
+    result = invoke("--files-from", "-", "--jobs", jobs)
+
+    assert result.code == 1, result.output
+    assert result.output == (
+        f"==> {paths[1]} <==\n<<< naming >>>\nerror: should be foo-bar\n"
+        f"==> {paths[3]} <==\n<<< naming >>>\nerror: should be foo-bar\n"
+    )
+
+
+def test_file(project_file, invoke):
+    first, second = create_projects(project_file.directory, INVALID, INVALID)
+    list_path = project_file.directory / "paths.txt"
+    list_path.write_bytes(f"{second}\0".encode("utf-8"))
+
+    result = invoke("--files-from", str(list_path), str(first), "--format", "ndjson")
+
+    assert result.code == 1, result.output
+    files = [line.split('"file":"')[1].split('"')[0] for line in result.output.splitlines()[:-1]]
+    assert files == [str(first), str(second)]
+
+
+def test_missing_file(project_file, invoke):
+    result = invoke("--files-from", str(project_file.directory / "missing.txt"))
+
+    assert result.code == 1
+    assert "missing.txt" in result.output
+
+
+def test_not_allowed_with_recursive(invoke):
+    result = invoke("--files-from", "-", "--recursive")
+
+    assert result.code == 2
+    assert "argument --files-from: not allowed with argument --recursive/-r" in result.output
+
+
+def test_bounded_consumption(project_file):
+    consumed = itertools.count()
+
+    def paths():
+        for i in range(100_000):
+            next(consumed)
+            yield str(project_file.directory / f"missing{i}")
+
+    results = run(paths(), jobs=2)
+    first = next(results)
+    results.close()
+
+    assert first.error is not None
+    # Only the batches in flight were read, plus the one waiting to be submitted
+    assert next(consumed) <= (2 * 2 + 1) * STREAM_BATCH_SIZE
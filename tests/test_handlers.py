@@ -0,0 +1,272 @@
+import gc
+import mmap
+import sys
+import weakref
+
+import pytest
+
+from pyproject_validate import engine, handlers
+from pyproject_validate.handlers import TOML_BACKENDS, FormatPreservingHandler, get_toml_backend
+
+AVAILABLE_BACKENDS = [name for name, backend in TOML_BACKENDS.items() if backend.available()]
+
+
+class TestFormatPreserving:
+    BEFORE = """\
+# Comments are preserved
+[build-system]
+requires = ["hatchling"]  # as is the formatting
+build-backend = 'hatchling.build'
+
+[project]
+name = "Foo.bAr"  # of unmodified values
+version = "0.0.1"
+dependencies = [
+  # even within
+  "foo",
+  "Bar",
+]
+optional-dependencies.dev = ["pytest",   "coverage"]
+optional-dependencies.docs = ["mkdocs"]
+
+[tool.foo]
+list = [ 1,2,3 ]
+"""
+    AFTER = """\
+# Comments are preserved
+[build-system]
+requires = ["hatchling"]  # as is the formatting
+build-backend = 'hatchling.build'
+
+[project]
+name = "foo-bar"  # of unmodified values
+version = "0.0.1"
+dependencies = [
+    "bar",
+    "foo",
+]
+optional-dependencies.dev = [
+    "coverage",
+    "pytest",
+]
+optional-dependencies.docs = ["mkdocs"]
+
+[tool.foo]
+list = [ 1,2,3 ]
+"""
+
+    @pytest.mark.parametrize("backend", AVAILABLE_BACKENDS)
+    def test_fix(self, project_file, invoke, backend):
+        project_file.write(self.BEFORE)
+
+        result = invoke("--fix", "--toml-backend", backend)
+
+        assert result.code == 0, result.output
+        assert not result.output
+        assert project_file.read() == self.AFTER
+
+    def test_other_modifications(self, project_file):
+        project_file.write(self.BEFORE)
+        handler = FormatPreservingHandler(str(project_file.path))
+        data = handler.load()
+
+        data["project"]["name"] = "foo-bar"
+        data["project"]["version"] = "1.0.0"
+        handler.save(data)
+
+        # Serialization of the entire document
+        assert "# Comments" not in project_file.read()
+        assert FormatPreservingHandler(str(project_file.path)).load() == data
+
+    def test_repeated_save(self, project_file):
+        project_file.write(self.BEFORE)
+        handler = FormatPreservingHandler(str(project_file.path))
+        data = handler.load()
+
+        data["project"]["name"] = "foo-bar"
+        handler.save(data)
+        data["project"]["name"] = "foo-baz"
+        handler.save(data)
+
+        assert project_file.read() == self.BEFORE.replace('"Foo.bAr"', '"foo-baz"')
+
+    def test_unmapped_value(self, project_file):
+        project_file.write(
+            """\
+[project]
+name = "Foo"
+version = "0.0.1"
+"""
+        )
+        handler = FormatPreservingHandler(str(project_file.path))
+        data = handler.load()
+
+        data["project"]["dependencies"] = ["foo"]
+        handler.save(data)
+
+        assert FormatPreservingHandler(str(project_file.path)).load() == data
+
+
+class TestWrite:
+    TEXT = """\
+[project]
+name = "foo"
+version = "0.0.1"
+"""
+
+    def test_unchanged(self, project_file):
+        project_file.write(self.TEXT)
+        before = project_file.path.stat()
+        handler = FormatPreservingHandler(str(project_file.path))
+
+        handler.save(handler.load())
+
+        after = project_file.path.stat()
+        assert (after.st_ino, after.st_mtime_ns) == (before.st_ino, before.st_mtime_ns)
+
+    def test_atomic_replace(self, project_file):
+        project_file.write(self.TEXT)
+        project_file.path.chmod(0o640)
+        before = project_file.path.stat()
+        handler = FormatPreservingHandler(str(project_file.path))
+
+        handler.write(self.TEXT.replace("foo", "bar"))
+
+        after = project_file.path.stat()
+        assert project_file.read() == self.TEXT.replace("foo", "bar")
+        assert after.st_mode == before.st_mode
+        assert [path.name for path in project_file.directory.iterdir()] == ["pyproject.toml"]
+
+    def test_symbolic_link(self, project_file):
+        target = project_file.directory / "target.toml"
+        target.write_text(self.TEXT, encoding="utf-8")
+        try:
+            project_file.path.symlink_to(target)
+        except OSError:  # no cov
+            pytest.skip("symbolic links are not supported")
+
+        FormatPreservingHandler(str(project_file.path)).write(self.TEXT.replace("foo", "bar"))
+
+        assert project_file.path.is_symlink()
+        assert target.read_text(encoding="utf-8") == self.TEXT.replace("foo", "bar")
+
+
+class TestMemoryMapped:
+    TEXT = """\
+[build-system]
+requires = ["hatchling"]
+build-backend = "hatchling.build"
+
+[project]
+name = "Foo"
+version = "0.0.1"
+"""
+
+    @pytest.fixture(autouse=True)
+    def map_every_file(self, monkeypatch):
+        monkeypatch.setattr(handlers, "MMAP_THRESHOLD", 1)
+
+    def test_load(self, project_file):
+        project_file.path.write_bytes(self.TEXT.replace("\n", "\r\n").encode("utf-8"))
+        handler = FormatPreservingHandler(str(project_file.path))
+
+        assert isinstance(handler.read_bytes(), mmap.mmap)
+        assert handler.read() == self.TEXT
+        assert handler.load()["project"]["name"] == "Foo"
+
+    def test_empty(self, project_file):
+        project_file.write("")
+
+        assert FormatPreservingHandler(str(project_file.path)).read_bytes() == b""
+
+    def test_unchanged(self, project_file):
+        project_file.write(self.TEXT)
+        before = project_file.path.stat()
+        handler = FormatPreservingHandler(str(project_file.path))
+
+        handler.save(handler.load())
+
+        after = project_file.path.stat()
+        assert (after.st_ino, after.st_mtime_ns) == (before.st_ino, before.st_mtime_ns)
+
+    def test_fix(self, project_file, invoke):
+        project_file.write(self.TEXT)
+
+        result = invoke("--fix")
+
+        assert result.code == 0, result.output
+        assert project_file.read() == self.TEXT.replace('"Foo"', '"foo"')
+
+    @pytest.mark.parametrize("threshold", [1, handlers.MMAP_THRESHOLD])
+    def test_released_after_validation(self, project_file, monkeypatch, threshold):
+        monkeypatch.setattr(handlers, "MMAP_THRESHOLD", threshold)
+        project_file.write(self.TEXT)
+        created = []
+        original_get_handler = engine.get_handler
+
+        def get_handler(*args, **kwargs):
+            handler = original_get_handler(*args, **kwargs)
+            created.append(weakref.ref(handler))
+            return handler
+
+        monkeypatch.setattr(engine, "get_handler", get_handler)
+
+        result = engine.validate_file(str(project_file.path), locate=True)
+        gc.collect()
+
+        # Neither the handler nor the mapping of the file are kept alive by the diagnostics
+        assert created[0]() is None
+        (error,) = next(report for report in result.reports if report.name == "naming").errors
+        assert (error.line, error.column) == (6, 8)
+
+    def test_cached(self, project_file, invoke):
+        project_file.write(self.TEXT)
+
+        for _ in range(2):
+            result = invoke()
+
+            assert result.code == 1, result.output
+            assert result.output == "<<< naming >>>\nerror: should be foo\n"
+
+
+class TestBackends:
+    def test_default(self, monkeypatch):
+        expected = "tomli" if handlers.TomliBackend.available() else "tomllib"
+        assert get_toml_backend().name == expected
+
+        monkeypatch.setattr(handlers, "_default_backend", None)
+        monkeypatch.setattr(handlers.TomliBackend, "available", classmethod(lambda cls: False))
+        if sys.version_info >= (3, 11):
+            assert get_toml_backend().name == "tomllib"
+        else:
+            with pytest.raises(ValueError, match="no TOML backend is available"):
+                get_toml_backend()
+
+    @pytest.mark.parametrize("backend", AVAILABLE_BACKENDS)
+    def test_round_trip(self, backend):
+        backend = get_toml_backend(backend)
+        text = '[project]\nname = "foo"\ndate = 1979-05-27\n'
+
+        data = backend.loads(text)
+
+        assert backend.loads(backend.dumps(data)) == data
+        with pytest.raises(backend.error):
+            backend.loads("[project")
+
+    def test_unknown(self):
+        with pytest.raises(ValueError, match="unknown TOML backend: foo"):
+            get_toml_backend("foo")
+
+    def test_unavailable(self, monkeypatch):
+        monkeypatch.setattr(handlers.TomllibBackend, "available", classmethod(lambda cls: False))
+
+        with pytest.raises(ValueError, match="TOML backend is not available: tomllib"):
+            get_toml_backend("tomllib")
+
+    def test_unavailable_option(self, project_file, invoke, monkeypatch):
+        monkeypatch.setattr(handlers.TomllibBackend, "available", classmethod(lambda cls: False))
+
+        result = invoke("--toml-backend", "tomllib")
+
+        assert result.code == 2
+        assert "TOML backend is not available: tomllib" in result.output
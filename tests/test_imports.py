@@ -0,0 +1,79 @@
+"""
+Guards the startup time of the CLI, which dominates the cost of running as a pre-commit hook,
+by ensuring expensive modules are only imported when they are actually needed.
+"""
+import json
+import os
+import re
+import subprocess
+import sys
+
+from pyproject_validate.handlers import get_toml_backend
+
+from .helpers import VALID
+
+EXPENSIVE_MODULES = {
+    "concurrent.futures",
+    "packaging",
+    "pydantic",
+    "pyproject_validate.models",
+    "tomli",
+    "tomli_w",
+    "tomllib",
+}
+DEFAULT_TOML_MODULE = get_toml_backend().module
+# Of all imports when validating a clean file, including those of the interpreter itself. This is
+# almost twice the current cost so that noise does not exceed it while eagerly importing pydantic or
+# packaging does, each of which costs about as much as everything else combined.
+COLD_START_BUDGET = 0.12
+VALIDATE_CLEAN_FILE = """\
+from pyproject_validate.cli import main
+sys.argv = ["pyproject-validate", "--no-cache"]
+try:
+    main()
+except SystemExit as e:
+    assert e.code == 0
+"""
+
+
+def imported_modules(code, cwd=None):
+    script = f"import json, sys\n{code}\nprint(json.dumps(sorted(sys.modules)))"
+    result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, cwd=cwd, check=True)
+    return set(json.loads(result.stdout.splitlines()[-1]))
+
+
+def test_cli():
+    modules = imported_modules("import pyproject_validate.cli")
+
+    assert not modules & (EXPENSIVE_MODULES | {"pyproject_validate.engine", "pyproject_validate._version"})
+
+
+def import_time(code, cwd=None):
+    """
+    Returns the total time in seconds spent importing modules as reported by `-X importtime`.
+    """
+    script = f"import sys\n{code}"
+    env = dict(os.environ, PYPROJECT_VALIDATE_NO_DAEMON="1")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", script], capture_output=True, text=True, cwd=cwd, env=env, check=True
+    )
+    # import time: self [us] | cumulative | imported package
+    return sum(int(match.group(1)) for match in re.finditer(r"^import time:\s+(\d+) \|", result.stderr, re.M)) / 1e6
+
+
+def test_valid_file(project_file):
+    project_file.write(VALID)
+
+    modules = imported_modules(VALIDATE_CLEAN_FILE, cwd=str(project_file.directory))
+
+    # Deserialization is the only unavoidable cost
+    assert modules & EXPENSIVE_MODULES == {DEFAULT_TOML_MODULE}
+
+
+def test_cold_start_budget(project_file):
+    project_file.write(VALID)
+
+    # The fastest of a few runs is the least affected by other activity on the machine
+    elapsed = min(import_time(VALIDATE_CLEAN_FILE, cwd=str(project_file.directory)) for _ in range(3))
+
+    assert elapsed < COLD_START_BUDGET, f"imports took {elapsed * 1000:.0f} ms"
@@ -0,0 +1,101 @@
+import pytest
+
+from .helpers import INVALID, VALID, create_projects
+
+
+@pytest.mark.parametrize("jobs", ["1", "2"])
+def test_all_valid(project_file, invoke, jobs):
+    paths = create_projects(project_file.directory, VALID, VALID, VALID)
+
+    result = invoke("--jobs", jobs, *map(str, paths))
+
+    assert result.code == 0, result.output
+    assert not result.output
+
+
+@pytest.mark.parametrize("jobs", ["1", "2"])
+def test_combined_exit_code(project_file, invoke, jobs):
+    paths = create_projects(project_file.directory, VALID, INVALID, VALID, INVALID)
+
+    result = invoke("--jobs", jobs, *map(str, paths))
+
+    assert result.code == 1, result.output
+    assert (
+        result.output
+        == f"""\
+==> {paths[1]} <==
+<<< naming >>>
+error: should be foo-bar
+==> {paths[3]} <==
+<<< naming >>>
+error: should be foo-bar
+"""
+    )
+
+
+def test_directories(project_file, invoke):
+    paths = create_projects(project_file.directory, VALID, INVALID)
+
+    result = invoke(*(str(path.parent) for path in paths))
+
+    assert result.code == 1, result.output
+    assert (
+        result.output
+        == f"""\
+==> {paths[1]} <==
+<<< naming >>>
+error: should be foo-bar
+"""
+    )
+
+
+def test_fix(project_file, invoke):
+    paths = create_projects(project_file.directory, INVALID, INVALID)
+
+    result = invoke("--fix", "--jobs", "2", *map(str, paths))
+
+    assert result.code == 0, result.output
+    assert not result.output
+    for path in paths:
+        assert 'name = "foo-bar"' in path.read_text(encoding="utf-8")
+
+
+@pytest.mark.parametrize("jobs", ["1", "2"])
+def test_duplicate_paths(project_file, invoke, jobs):
+    (path,) = create_projects(project_file.directory, INVALID)
+    link = project_file.directory / "link.toml"
+    try:
+        link.symlink_to(path)
+    except OSError:  # no cov
+        pytest.skip("symbolic links are not supported")
+
+    result = invoke(
+        "--fix", "--jobs", jobs, "project0/pyproject.toml", "./project0/pyproject.toml", str(path), str(link)
+    )
+
+    assert result.code == 0, result.output
+    assert not result.output
+    assert 'name = "foo-bar"' in path.read_text(encoding="utf-8")
+
+    path.write_text(INVALID, encoding="utf-8")
+    result = invoke("--jobs", jobs, str(link), "project0/pyproject.toml")
+
+    assert result.code == 1, result.output
+    assert result.output == "<<< naming >>>\nerror: should be foo-bar\n"
+
+
+def test_missing_file(project_file, invoke):
+    paths = create_projects(project_file.directory, VALID)
+    missing = project_file.directory / "missing" / "pyproject.toml"
+
+    result = invoke(str(paths[0]), str(missing))
+
+    assert result.code == 1, result.output
+    assert result.output.startswith(f"==> {missing} <==\n")
+
+
+def test_invalid_jobs(project_file, invoke):
+    result = invoke("--jobs", "0")
+
+    assert result.code == 2, result.output
+    assert "must be a positive integer" in result.output
@@ -0,0 +1,124 @@
+import subprocess
+import sys
+
+import pytest
+
+from pyproject_validate.engine import validate_file
+from pyproject_validate.validators import REGISTRY, schedule
+
+from .helpers import VALID
+
+INVALID = """\
+[build-system]
+requires = ["hatchling"]
+build-backend = "hatchling.build"
+
+[project]
+name = "Foo"
+version = "0.0.1"
+dependencies = ["foo", "Bar"]
+"""
+
+
+class TestSchedule:
+    def test_default(self):
+        assert schedule() == ["specs", "naming", "dependencies"]
+
+    def test_select(self):
+        assert schedule(select=["dependencies", "naming"]) == ["naming", "dependencies"]
+
+    def test_ignore(self):
+        assert schedule(ignore=["naming"]) == ["specs", "dependencies"]
+
+    def test_unknown(self):
+        with pytest.raises(ValueError, match="unknown validators: bar, foo"):
+            schedule(select=["foo", "specs"], ignore=["bar"])
+
+    def test_dependencies_first(self, monkeypatch):
+        monkeypatch.setitem(REGISTRY, "specs", REGISTRY["specs"]._replace(cost=100))
+
+        assert schedule() == ["specs", "naming", "dependencies"]
+
+
+def report_names(path, **kwargs):
+    return [report.name for report in validate_file(str(path), **kwargs).reports]
+
+
+def test_missing_sections(project_file):
+    project_file.write(VALID)
+
+    assert report_names(project_file.path) == ["specs", "naming"]
+
+
+def test_failed_dependency(project_file):
+    project_file.write(INVALID.replace('version = "0.0.1"\n', ""))
+
+    assert report_names(project_file.path) == ["specs"]
+
+
+def test_disabled_dependency(project_file):
+    project_file.write(INVALID.replace('version = "0.0.1"\n', ""))
+
+    assert report_names(project_file.path, validators=["naming", "dependencies"]) == ["naming", "dependencies"]
+
+
+def test_select(project_file, invoke):
+    project_file.write(INVALID)
+
+    result = invoke("--select", "naming")
+
+    assert result.code == 1, result.output
+    assert result.output == "<<< naming >>>\nerror: should be foo\n"
+
+
+def test_ignore(project_file, invoke):
+    project_file.write(INVALID)
+
+    result = invoke("--ignore", "specs,naming")
+
+    assert result.code == 1, result.output
+    assert result.output == "<<< dependencies >>>\nerror: dependencies #2 should be: bar\n"
+
+
+def test_unknown(project_file, invoke):
+    result = invoke("--select", "foo")
+
+    assert result.code == 2
+    assert "unknown validators: foo" in result.output
+
+
+def test_disabled_not_imported(project_file):
+    project_file.write(INVALID)
+    script = """\
+import sys
+from pyproject_validate.cli import main
+sys.argv = ["pyproject-validate", "--no-cache", "--select", "naming"]
+try:
+    main()
+except SystemExit:
+    pass
+print(sorted(name for name in sys.modules if name.startswith("pyproject_validate.validators.")))
+"""
+    result = subprocess.run(
+        [sys.executable, "-c", script], capture_output=True, text=True, cwd=str(project_file.directory), check=True
+    )
+
+    assert result.stdout.splitlines()[-1] == "['pyproject_validate.validators.naming']"
+
+
+@pytest.mark.parametrize("args", [("--select", "naming,dependencies"), ("--ignore", "specs")])
+def test_disabled_dependency_invalid_types(project_file, invoke, args):
+    project_file.write(
+        INVALID.replace('"Foo"', "1").replace('["foo", "Bar"]', '["foo", 2]') + "optional-dependencies = 3\n"
+    )
+
+    result = invoke(*args)
+
+    assert result.code == 1, result.output
+    assert result.output == (
+        "<<< naming >>>\n"
+        "error: must be a string\n"
+        "<<< dependencies >>>\n"
+        "error: dependencies #2: must be a string\n"
+        "error: optional dependencies must be a table\n"
+    )
@@ -0,0 +1,93 @@
+import json
+
+import pytest
+
+from .helpers import INVALID, VALID
+
+
+def parse_records(output):
+    return [json.loads(line) for line in output.splitlines()]
+
+
+@pytest.mark.parametrize("jobs", ["1", "2"])
+def test_ndjson(project_file, invoke, jobs):
+    paths = []
+    for i, text in enumerate((INVALID, VALID, "[project")):
+        path = project_file.directory / f"project{i}" / "pyproject.toml"
+        path.parent.mkdir()
+        path.write_text(text, encoding="utf-8")
+        paths.append(str(path))
+
+    result = invoke("--format", "ndjson", "--jobs", jobs, *paths)
+
+    assert result.code == 1, result.output
+    records = parse_records(result.output)
+    assert records[0] == {
+        "type": "diagnostic",
+        "file": paths[0],
+        "validator": "naming",
+        "severity": "error",
+        "message": "should be foo-bar",
+        "fixable": True,
+        "path": "project.name",
+        "line": 6,
+        "column": 8,
+    }
+    assert records[1]["file"] == paths[2]
+    assert records[1]["validator"] is None
+    assert records[1]["line"] is None
+    assert records[1]["severity"] == "error"
+    assert records[2] == {"type": "summary", "files": 3, "errors": 2, "warnings": 0, "exit_code": 1}
+
+
+def test_ndjson_default_path(project_file, invoke):
+    project_file.write(INVALID)
+
+    result = invoke("--format", "ndjson")
+
+    assert result.code == 1, result.output
+    records = parse_records(result.output)
+    assert records[0]["file"] == str(project_file.path)
+    assert records[-1]["type"] == "summary"
+
+
+def test_ndjson_fix(project_file, invoke):
+    project_file.write(INVALID)
+
+    result = invoke("--format", "ndjson", "--fix")
+
+    assert result.code == 0, result.output
+    assert parse_records(result.output) == [{"type": "summary", "files": 1, "errors": 0, "warnings": 0, "exit_code": 0}]
+
+
+def test_ndjson_unfixable(project_file, invoke):
+    project_file.write(
+        """\
+[build-system]
+requires = ["hatchling"]
+build-backend = "hatchling.build"
+
+[project]
+name = "foo"
+version = "0.0.1"
+dependencies = ["foo bar"]
+"""
+    )
+
+    result = invoke("--format", "ndjson", "--fix")
+
+    assert result.code == 1, result.output
+    records = parse_records(result.output)
+    assert records[0]["validator"] == "dependencies"
+    assert records[0]["fixable"] is False
+    assert records[-1]["errors"] == len(records) - 1
+
+
+def test_ndjson_cached_positions(project_file, invoke):
+    project_file.write(INVALID)
+
+    first = parse_records(invoke("--format", "ndjson").output)
+    second = parse_records(invoke("--format", "ndjson").output)
+
+    assert first == second
+    assert (second[0]["line"], second[0]["column"]) == (6, 8)
@@ -0,0 +1,213 @@
+import json
+import time
+from collections import OrderedDict
+
+import pytest
+
+from pyproject_validate import requirements
+
+
+@pytest.fixture(autouse=True)
+def isolated_memo(monkeypatch):
+    monkeypatch.setattr(requirements, "_memo", OrderedDict())
+    monkeypatch.setattr(requirements, "_new", {})
+    monkeypatch.setattr(requirements, "_seeded", set())
+
+
+def test_normalized():
+    assert requirements.normalize_requirement("bAr.Baz[TLS]>=1.2RC5") == ("bar-baz[tls]>=1.2rc5", None)
+
+
+def test_invalid():
+    normalized, error = requirements.normalize_requirement("bar^0.1")
+
+    assert normalized is None
+    assert error == """Parse error at "'^0.1'": Expected string_end"""
+
+
+def test_parsed_once(monkeypatch):
+    calls = []
+    original = requirements._parse_requirement
+    monkeypatch.setattr(requirements, "_parse_requirement", lambda d: calls.append(d) or original(d))
+
+    for _ in range(3):
+        requirements.normalize_requirement("Foo (>=1)")
+
+    assert calls == ["Foo (>=1)"]
+    assert requirements.drain() == {"Foo (>=1)": ("foo>=1", None)}
+    assert requirements.drain() == {}
+
+
+def test_fast_path_not_drained():
+    requirements.normalize_requirement("Foo")
+
+    assert requirements.drain() == {}
+
+
+def test_bounded(monkeypatch):
+    monkeypatch.setattr(requirements, "MAX_MEMO_ENTRIES", 2)
+
+    requirements.normalize_requirement("Foo")
+    requirements.normalize_requirement("Bar")
+    # The least recently used is evicted
+    requirements.normalize_requirement("Foo")
+    requirements.normalize_requirement("Baz")
+
+    assert list(requirements._memo) == ["Foo", "Baz"]
+
+
+def test_evicted_concurrently(monkeypatch):
+    class Memo(OrderedDict):
+        def get(self, key, default=None):
+            value = super().get(key, default)
+            # Another thread evicts the entry right after it was looked up
+            self.pop(key, None)
+            return value
+
+    monkeypatch.setattr(requirements, "_memo", Memo({"Foo": ("foo", None)}))
+
+    assert requirements.normalize_requirement("Foo") == ("foo", None)
+
+
+def test_persisted(tmp_path, monkeypatch):
+    path = str(tmp_path / "requirements.json")
+    requirements.persist(path, {"Foo (>=1)": ("foo>=1", None)})
+
+    monkeypatch.setattr(requirements, "_parse_requirement", lambda d: pytest.fail(f"parsed {d}"))
+    requirements.seed(path)
+
+    assert requirements.normalize_requirement("Foo (>=1)") == ("foo>=1", None)
+
+
+def test_seeding_cheaper_than_parsing(tmp_path):
+    path = str(tmp_path / "requirements.json")
+    dependencies = [f"Foo{i} (>=1)" for i in range(requirements.MAX_PERSISTED_ENTRIES)]
+    assert requirements._fast_normalize_requirement(dependencies[0]) is None
+    requirements.persist(path, {dependency: requirements._parse_requirement(dependency) for dependency in dependencies})
+
+    start = time.perf_counter()
+    requirements.seed(path)
+    seeding = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for dependency in dependencies:
+        requirements._parse_requirement(dependency)
+    parsing = time.perf_counter() - start
+
+    assert len(requirements._memo) == len(dependencies)
+    assert seeding < parsing
+
+
+def test_persisted_other_packaging_version(tmp_path, monkeypatch):
+    path = tmp_path / "requirements.json"
+    path.write_text(json.dumps({"packaging": "0.1", "entries": {"Foo": ["bar", None]}}), encoding="utf-8")
+
+    requirements.seed(str(path))
+
+    assert requirements.normalize_requirement("Foo") == ("foo", None)
+
+
+def test_persisted_bounded(tmp_path, monkeypatch):
+    monkeypatch.setattr(requirements, "MAX_PERSISTED_ENTRIES", 2)
+    path = tmp_path / "requirements.json"
+
+    requirements.persist(str(path), {"a": ("a", None), "b": ("b", None)})
+    requirements.persist(str(path), {"c": ("c", None)})
+
+    assert list(json.loads(path.read_text(encoding="utf-8"))["entries"]) == ["b", "c"]
+
+
+def test_run_persists(project_file, invoke, isolated_cache):
+    project_file.write(
+        """\
+[build-system]
+requires = ["hatchling"]
+build-backend = "hatchling.build"
+
+[project]
+name = "foo"
+version = "0.0.1"
+dependencies = ["Bar", "Foo (>=1)"]
+"""
+    )
+
+    invoke()
+
+    # Only what needed `packaging` is worth persisting
+    entries = json.loads((isolated_cache / "requirements.json").read_text(encoding="utf-8"))["entries"]
+    assert entries == {"Foo (>=1)": ["foo>=1", None]}
+
+
+NAMES = ["foo", "Foo.Bar_baz", "a", "a1-", "-a", "foo bar"]
+EXTRAS = ["", "[]", "[tls]", "[ b , A ]", "[a,a]", "[a,]", "[a b]", "[a"]
+SPECIFIERS = [
+    "",
+    ">=1",
+    " >= 1.2RC5 , <2",
+    "==1.0.*",
+    "!=1.0.post1.dev2",
+    "~=1.0",
+    "~=1",
+    "<=1.*",
+    "===1",
+    ">=1,>=1.0",
+    "(>=1)",
+    ">=1,",
+    "==1.0+local",
+    ">=v1",
+    "^0.1",
+]
+MARKERS = [
+    "",
+    "; python_version < '3.8'",
+    ';python_version<"3.8" and os_name == "nt"',
+    "; '3' in python_version or extra == 'a\" b'",
+    "; platform_system not in 'Windows'",
+    "; python_version < '3' and",
+    "; (python_version < '3')",
+    "; os.name == 'nt'",
+    "; python_version",
+    ";",
+]
+URLS = [
+    "@ https://example.com/foo.zip",
+    " @ https://example.com/foo.zip ; python_version < '3'",
+    "@ https://example.com/foo;bar",
+    "@ file:///foo",
+    "@ https://[::1/foo",
+    "@ foo",
+]
+
+
+def fast_path_cases():
+    for name in NAMES:
+        for extras in EXTRAS:
+            for specifiers in SPECIFIERS:
+                for marker in MARKERS:
+                    yield f"{name}{extras}{specifiers}{marker}"
+
+            for url in URLS:
+                yield f"{name}{extras}{url}"
+
+
+def test_fast_path_equivalence():
+    handled = 0
+    for dependency in fast_path_cases():
+        normalized = requirements._fast_normalize_requirement(dependency)
+        if normalized is None:
+            continue
+
+        handled += 1
+        assert (normalized, None) == requirements._parse_requirement(dependency), dependency
+
+    # Guard against the fast path silently handling nothing
+    assert handled > 400
+
+
+@pytest.mark.parametrize(
+    "dependency",
+    ["foo (>=1)", "foo>=1,>=1.0", "foo; (os_name == 'nt')", "foo @ file:///foo", "foo==1.0+local"],
+)
+def test_fast_path_fallback(dependency):
+    assert requirements._fast_normalize_requirement(dependency) is None
+    assert requirements.normalize_requirement(dependency) == requirements._parse_requirement(dependency)
@@ -0,0 +1,112 @@
+import subprocess
+import sys
+
+import pytest
+
+from pyproject_validate.models import BuildSystemConfig, ProjectConfig
+from pyproject_validate.schema import build_system_is_valid, project_is_valid
+
+
+def models_accept(model, data):
+    try:
+        model(**data)
+    except Exception:
+        return False
+
+    return True
+
+
+BUILD_SYSTEMS = [
+    {"requires": ["hatchling"], "build-backend": "hatchling.build"},
+    {"requires": ["hatchling"], "build-backend": "hatchling.build", "backend-path": ["."]},
+    {"requires": ["hatchling"], "build-backend": "hatchling.build", "backend-path": "."},
+    {"requires": ["hatchling"]},
+    {"build-backend": "hatchling.build"},
+    {"requires": "hatchling", "build-backend": "hatchling.build"},
+    {"requires": ["hatchling"], "build-backend": []},
+    {},
+]
+
+PROJECTS = [
+    {"name": "foo", "version": "0.0.1"},
+    {"name": "foo", "dynamic": ["version"]},
+    {"name": "foo"},
+    {"version": "0.0.1"},
+    {"name": "foo", "version": "0.0.1", "dynamic": ["name"]},
+    {"name": "foo", "version": "0.0.1", "dynamic": ["version"]},
+    {"name": "foo", "version": "0.0.1", "description": "bar", "dynamic": ["description"]},
+    {"name": "foo", "version": "0.0.1", "entry-points": {"bar": {"baz": "x:y"}}, "dynamic": ["entry-points"]},
+    {"name": "foo", "version": "0.0.1", "authors": [{"name": "U.N. Owen", "email": "void@some.where"}]},
+    {"name": "foo", "version": "0.0.1", "authors": [{"name": [9000], "email": []}]},
+    {"name": "foo", "version": "0.0.1", "classifiers": ["Programming Language :: Python", []]},
+    {"name": "foo", "version": "0.0.1", "dependencies": ["bar"]},
+    {"name": "foo", "version": "0.0.1", "dependencies": "bar"},
+    {"name": "foo", "version": "0.0.1", "entry-points": {"bar": "baz"}},
+    {"name": "foo", "version": "0.0.1", "gui-scripts": {"bar": "baz:main"}},
+    {"name": "foo", "version": "0.0.1", "keywords": ["bar", ["baz"]]},
+    {"name": "foo", "version": "0.0.1", "license": "MIT"},
+    {"name": "foo", "version": "0.0.1", "license": {"file": "LICENSE.txt"}},
+    {"name": "foo", "version": "0.0.1", "license": {"text": "..."}},
+    {"name": "foo", "version": "0.0.1", "license": {"file": "LICENSE.txt", "text": "..."}},
+    {"name": "foo", "version": "0.0.1", "license-files": {"globs": ["LICENSE*"]}},
+    {"name": "foo", "version": "0.0.1", "license-files": {"paths": ["LICENSE.txt"]}},
+    {"name": "foo", "version": "0.0.1", "license-files": {}},
+    {"name": "foo", "version": "0.0.1", "license-files": {"globs": "LICENSE*"}},
+    {"name": "foo", "version": "0.0.1", "optional-dependencies": {"bar": ["baz"]}},
+    {"name": "foo", "version": "0.0.1", "optional-dependencies": {"bar": "baz"}},
+    {"name": "foo", "version": "0.0.1", "readme": "README.md"},
+    {"name": "foo", "version": "0.0.1", "readme": "README.RST"},
+    {"name": "foo", "version": "0.0.1", "readme": "README"},
+    {"name": "foo", "version": "0.0.1", "readme": {"file": "README.md", "content-type": "text/markdown"}},
+    {"name": "foo", "version": "0.0.1", "readme": {"text": "...", "content-type": "text/plain"}},
+    {"name": "foo", "version": "0.0.1", "readme": {"file": "README.md", "text": "...", "content-type": "text/plain"}},
+    {"name": "foo", "version": "0.0.1", "readme": {"file": "README.md"}},
+    {"name": "foo", "version": "0.0.1", "readme": {"file": "README.md", "content-type": "text/html"}},
+    {"name": "foo", "version": "0.0.1", "scripts": {"bar": "baz:main"}},
+    {"name": "foo", "version": "0.0.1", "scripts": {"bar": ["baz:main"]}},
+    {"name": "foo", "version": "0.0.1", "urls": {"bar": "https://example.com"}},
+    {"name": "foo", "version": "0.0.1", "requires-python": ">=3.7", "dynamic": ["requires-python"]},
+]
+
+# Values the models coerce, for which the fast checks defer to the models
+COERCED_PROJECTS = [
+    {"name": "foo", "version": "0.0.1", "entry-points": {"bar": {"baz": 9000}}},
+    {"name": "foo", "version": "0.0.1", "license": []},
+    {"name": 9000, "version": "0.0.1"},
+    {"name": "foo", "version": 9000},
+    {"name": "foo", "version": "0.0.1", "readme": {"file": "README.md", "content-type": "text/plain", "charset": 8}},
+]
+
+
+@pytest.mark.parametrize("data", BUILD_SYSTEMS)
+def test_build_system(data):
+    assert build_system_is_valid(data) == models_accept(BuildSystemConfig, data)
+
+
+def test_build_system_coerced():
+    data = {"requires": [9000], "build-backend": "hatchling.build"}
+
+    assert not build_system_is_valid(data)
+    assert models_accept(BuildSystemConfig, data)
+
+
+@pytest.mark.parametrize("data", PROJECTS)
+def test_project(data):
+    assert project_is_valid(data) == models_accept(ProjectConfig, data)
+
+
+@pytest.mark.parametrize("data", COERCED_PROJECTS)
+def test_project_coerced(data):
+    assert not project_is_valid(data)
+    assert models_accept(ProjectConfig, data)
+
+
+def test_models_not_imported():
+    script = "import sys; from pyproject_validate.validators import SpecValidator; " + (
+        "SpecValidator().validate({'build-system': {'requires': [], 'build-backend': ''}, "
+        "'project': {'name': 'foo', 'version': '1'}}); "
+        "print('pyproject_validate.models' in sys.modules)"
+    )
+    result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True)
+
+    assert result.stdout.strip() == "False"
@@ -0,0 +1,107 @@
+import pytest
+import tomli
+
+from pyproject_validate.spans import ScanError, scan, scan_table
+
+DOCUMENT = """\
+# comment
+[build-system]
+requires = [ "hatchling>=0.14.0" , 'hatch-vcs' ]  # trailing
+build-backend = "hatchling.build"
+
+[project]
+name = 'foo'
+"version" = "0.0.1"
+description = \"\"\"multi
+line "quoted" \\\"\"\" string\"\"\"\"
+keywords = [
+    # comment
+    "a",   "b", # comment
+    '''c
+d''',
+]
+authors = [{ name = "U.N. Owen", email = "void@some.where" }]
+optional-dependencies.foo = ["bar[baz]", "qux; python_version < '3.8'"]
+"dotted . key".'literal' = 1979-05-27 07:32:00Z
+nested = [[1, 2], [3, -4.5e6], [true, false]]
+urls = {}
+
+[[tool.foo.items]]
+value = 1
+[tool.foo.items.sub]
+value = 2
+
+[[tool.foo.items]]
+value = 3
+"""
+
+
+def get_value(data, path):
+    for key in path:
+        data = data[key]
+
+    return data
+
+
+def test_values():
+    spans = scan(DOCUMENT)
+    data = tomli.loads(DOCUMENT)
+
+    for path, (start, end) in spans.items():
+        assert tomli.loads(f"x = {DOCUMENT[start:end]}")["x"] == get_value(data, path), path
+
+
+def test_paths():
+    spans = scan(DOCUMENT)
+
+    assert ("project", "optional-dependencies", "foo", 1) in spans
+    assert ("project", "authors", 0, "email") in spans
+    assert ("project", "dotted . key", "literal") in spans
+    assert ("tool", "foo", "items", 0, "sub", "value") in spans
+    assert ("tool", "foo", "items", 1, "value") in spans
+
+
+def test_table():
+    text = """\
+project.name = "foo"
+
+[tool.foo]
+# Not scanned
+x = 1 y = 2
+
+[ "project" ]
+version = "0.0.1"
+
+[build-system]
+requires = []
+
+[project.optional-dependencies]
+dev = ["foo"]
+"""
+    spans = scan_table(text, "project")
+
+    assert list(spans) == [
+        ("project", "name"),
+        ("project", "version"),
+        ("project", "optional-dependencies", "dev", 0),
+        ("project", "optional-dependencies", "dev"),
+    ]
+    start, end = spans["project", "optional-dependencies", "dev"]
+    assert text[start:end] == '["foo"]'
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "x = ",
+        "x = [1, 2",
+        "x = [1 2]",
+        "x = {a = 1 b = 2}",
+        "x = 'unterminated",
+        "[table",
+        "x = 1 y = 2",
+    ],
+)
+def test_invalid(text):
+    with pytest.raises(ScanError):
+        scan(text)
@@ -0,0 +1,65 @@
+import json
+
+VALID = """\
+[build-system]
+requires = ["hatchling"]
+build-backend = "hatchling.build"
+
+[project]
+name = "foo"
+version = "0.0.1"
+dependencies = ["bar"]
+"""
+
+
+def test_summary(project_file, invoke):
+    project_file.write(VALID)
+
+    result = invoke("--timings")
+
+    assert result.code == 0, result.output
+    lines = result.output.splitlines()
+    assert lines[0].split() == ["phase", "count", "total", "(ms)", "mean", "(ms)", "max", "(ms)"]
+    phases = {line.split()[0] for line in lines[1:]}
+    assert phases == {
+        "run",
+        "discover",
+        "read",
+        "cache",
+        "load",
+        "validate:specs",
+        "validate:naming",
+        "validate:dependencies",
+    }
+
+
+def test_fix_phases(project_file, invoke):
+    project_file.write(VALID.replace('"foo"', '"Foo"'))
+
+    result = invoke("--fix", "--timings")
+
+    assert result.code == 0, result.output
+    phases = {line.split()[0] for line in result.output.splitlines()[1:]}
+    assert {"fix:naming", "save"} <= phases
+
+
+def test_trace_file(project_file, invoke, tmp_path):
+    paths = []
+    for i in range(3):
+        directory = project_file.directory / f"project{i}"
+        directory.mkdir()
+        path = directory / "pyproject.toml"
+        path.write_text(VALID, encoding="utf-8")
+        paths.append(str(path))
+
+    trace_file = tmp_path / "trace.json"
+
+    result = invoke("--no-cache", "--jobs", "2", "--trace-file", str(trace_file), *paths)
+
+    assert result.code == 0, result.output
+    assert not result.output
+
+    events = json.loads(trace_file.read_text(encoding="utf-8"))["traceEvents"]
+    assert all(event["ph"] == "X" and event["dur"] >= 0 for event in events)
+    assert sorted(event["args"]["path"] for event in events if event["name"] == "load") == paths
+    assert [event["name"] for event in events if "args" not in event] == ["run"]
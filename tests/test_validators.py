@@ -0,0 +1,123 @@
+import copy
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from pyproject_validate.diagnostics import Diagnostic
+from pyproject_validate.engine import MAX_FIX_PASSES, apply_validators
+from pyproject_validate.validators import REGISTRY, ValidationResult, Validator, ValidatorEntry, get_validators
+
+
+def project(name, dependencies):
+    return {
+        "build-system": {"requires": ["hatchling"], "build-backend": "hatchling.build"},
+        "project": {"name": name, "version": "0.0.1", "dependencies": dependencies},
+    }
+
+
+def test_shared_instances():
+    assert get_validators()["naming"] is get_validators(["naming"])["naming"]
+
+
+def test_fix_plan():
+    data = project("Foo", ["foo", "Bar"])
+    original = copy.deepcopy(data)
+    validator = get_validators()["dependencies"]
+
+    result = validator.validate(data)
+
+    assert data == original
+    assert [str(error) for error in result.errors] == ["dependencies #2 should be: bar"]
+    assert result.errors[0].path == ("project", "dependencies", 1)
+    assert result.fixes == {("project", "dependencies"): ["bar", "foo"]}
+
+    result.fix(data)
+
+    assert data["project"]["dependencies"] == ["bar", "foo"]
+
+
+def test_reentrant():
+    validator = get_validators()["dependencies"]
+
+    invalid = validator.validate(project("foo", ["foo bar"]))
+    valid = validator.validate(project("foo", ["foo"]))
+
+    assert not invalid.fixable
+    assert valid.fixable
+    assert not valid.errors
+
+
+def test_threads():
+    validator = get_validators()["naming"]
+    names = [f"Foo{i}" if i % 2 else f"foo{i}" for i in range(200)]
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(lambda name: validator.validate(project(name, [])), names))
+
+    for i, result in enumerate(results):
+        assert result.fixes == ({("project", "name"): f"foo{i}"} if i % 2 else {})
+
+
+class Suffix(Validator):
+    def __init__(self, suffix):
+        self.suffix = suffix
+        self.calls = 0
+
+    def validate(self, data):
+        self.calls += 1
+        result = ValidationResult()
+        name = data["project"]["name"]
+        if not name.lower().endswith(self.suffix.lower()):
+            result.errors.append(Diagnostic(("project", "name"), "should end with {}", self.suffix))
+            result.fixes[("project", "name")] = name + self.suffix
+
+        return result
+
+
+class TestConvergence:
+    @pytest.fixture
+    def register(self, monkeypatch):
+        def register(name, validator, section):
+            monkeypatch.setitem(REGISTRY, name, ValidatorEntry("", (section,), cost=5))
+            return validator
+
+        return register
+
+    def test_converges(self, register):
+        validators = get_validators(["naming"])
+        suffix = validators["suffix"] = register("suffix", Suffix("-Py"), "project.name")
+        unrelated = validators["unrelated"] = register("unrelated", Suffix(""), "project.version")
+        data = project("foo", [])
+
+        outcome = apply_validators(data, validators, fix=True)
+
+        assert outcome.need_fixing
+        assert not outcome.unfixable_errors
+        # The suffix that was added is then normalized
+        assert data["project"]["name"] == "foo-py"
+        assert [report.name for report in outcome.reports] == ["naming", "suffix", "unrelated"]
+        # Only the validators reading modified sections run again
+        assert suffix.calls == 3
+        assert unrelated.calls == 1
+
+    def test_conflict(self, register):
+        validators = get_validators(["naming"])
+        validators["suffix"] = register("suffix", Suffix("_x"), "project.name")
+        data = project("foo", [])
+
+        outcome = apply_validators(data, validators, fix=True)
+
+        assert outcome.unfixable_errors
+        assert outcome.reports[-1].name == "fix"
+        assert str(outcome.reports[-1].errors[0]) == f"fixes did not converge after {MAX_FIX_PASSES} passes"
+
+    def test_unfixable_after_fixes(self, register):
+        validators = get_validators(["naming"])
+        validators["suffix"] = register("suffix", Suffix("!"), "project.name")
+        data = project("foo", [])
+
+        outcome = apply_validators(data, validators, fix=True)
+
+        assert outcome.unfixable_errors
+        assert outcome.reports[-1].name == "naming"
+        assert not outcome.reports[-1].fixable
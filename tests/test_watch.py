@@ -0,0 +1,119 @@
+import os
+import signal
+import subprocess
+import sys
+import threading
+
+import pytest
+
+from pyproject_validate.watch import InotifyWatcher, PollingWatcher, wait_for_changes
+
+from .helpers import VALID
+
+linux_only = pytest.mark.skipif(not sys.platform.startswith("linux"), reason="inotify is only available on Linux")
+
+
+def replace(path, text):
+    temp_path = path.with_name(f"{path.name}.tmp")
+    temp_path.write_text(text, encoding="utf-8")
+    os.replace(temp_path, path)
+
+
+class TestPolling:
+    def test_modified(self, project_file):
+        project_file.write(VALID)
+        watcher = PollingWatcher([str(project_file.path)], interval=0.01)
+
+        assert watcher.wait(0.05) == set()
+
+        os.utime(project_file.path, ns=(0, 0))
+
+        assert watcher.wait(1) == {str(project_file.path)}
+        assert watcher.wait(0.05) == set()
+
+    def test_replaced(self, project_file):
+        project_file.write(VALID)
+        watcher = PollingWatcher([str(project_file.path)], interval=0.01)
+
+        replace(project_file.path, VALID.replace("foo", "bar"))
+
+        assert watcher.wait(1) == {str(project_file.path)}
+
+
+@linux_only
+class TestInotify:
+    def test_modified(self, project_file):
+        project_file.write(VALID)
+        watcher = InotifyWatcher([str(project_file.path)])
+        try:
+            assert watcher.wait(0.05) == set()
+
+            project_file.write(VALID.replace("foo", "bar"))
+
+            assert watcher.wait(1) == {str(project_file.path)}
+        finally:
+            watcher.close()
+
+    def test_replaced(self, project_file):
+        project_file.write(VALID)
+        watcher = InotifyWatcher([str(project_file.path)])
+        try:
+            replace(project_file.path, VALID.replace("foo", "bar"))
+
+            assert watcher.wait(1) == {str(project_file.path)}
+        finally:
+            watcher.close()
+
+    def test_other_files(self, project_file):
+        project_file.write(VALID)
+        watcher = InotifyWatcher([str(project_file.path)])
+        try:
+            (project_file.directory / "README.md").write_text("", encoding="utf-8")
+
+            assert watcher.wait(0.05) == set()
+        finally:
+            watcher.close()
+
+
+class FakeWatcher:
+    def __init__(self, *batches):
+        self.batches = list(batches)
+
+    def wait(self, timeout=None):
+        return set(self.batches.pop(0)) if self.batches else set()
+
+
+def test_debounce():
+    watcher = FakeWatcher({"b"}, {"a", "b"}, {"c"})
+
+    assert wait_for_changes(watcher) == ["a", "b", "c"]
+
+
+@linux_only
+def test_cli(project_file):
+    project_file.write(VALID)
+    process = subprocess.Popen(
+        [sys.executable, "-m", "pyproject_validate", "--watch", "--no-cache"],
+        cwd=str(project_file.directory),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    timer = threading.Timer(30, process.kill)
+    timer.start()
+    try:
+        assert process.stderr.readline().startswith("watching 1 file(s)")
+
+        project_file.write(VALID.replace('"foo"', '"Foo"'))
+
+        assert process.stdout.readline() == "<<< naming >>>\n"
+        assert process.stdout.readline() == "error: should be foo\n"
+        assert process.stderr.readline() == "validated 1 changed file(s): errors found\n"
+
+        process.send_signal(signal.SIGINT)
+
+        assert process.wait() == 0
+    finally:
+        timer.cancel()
+        process.kill()
+        process.communicate()